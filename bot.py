@@ -1,18 +1,32 @@
+import asyncio
+import functools
+import io
 import logging
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, MessageEntity
 from telegram.ext import (
     Application, CommandHandler, MessageHandler, 
     CallbackQueryHandler, filters, ContextTypes
 )
+import numpy as np
 import pandas as pd
+import requests
 import yfinance as yf
-from datetime import datetime, timedelta
+from cachetools import LRUCache, TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime
 import plotly.graph_objects as go
 import plotly.io as pio
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 from config import Config
-from indicator_analyzer import EnhancedSessionRangeAnalyzer
+from file_cache import FileCache
+from indicator_analyzer import Bars, EnhancedSessionRangeAnalyzer, Opt, atr_last, eastern_now
 from tradier_api import TradierAPI
 
 logging.basicConfig(
@@ -21,52 +35,533 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Static chart styling; only bar data and session levels change per request
+_CHART_LAYOUT = dict(
+    template='plotly_dark',
+    xaxis_title='Time',
+    yaxis_title='Price',
+    xaxis_rangeslider_visible=False
+)
+_SESSION_COLORS = {'asian': 'orange', 'london': 'cyan', 'ny': 'magenta'}
+_SESSION_LEVELS = (('high', 'dash'), ('low', 'dash'), ('mid', 'dot'))
+
+def _render_chart(ohlc: pd.DataFrame, sessions: Dict, ticker: str) -> bytes:
+    """Session-range candlestick chart as HTML bytes; module-level so it pickles"""
+    fig = go.Figure(layout=_CHART_LAYOUT)
+    fig.add_trace(go.Candlestick(
+        x=ohlc.index,
+        open=ohlc['Open'],
+        high=ohlc['High'],
+        low=ohlc['Low'],
+        close=ohlc['Close'],
+        name=ticker
+    ))
+    
+    for name, session in sessions.items():
+        for level, dash in _SESSION_LEVELS:
+            fig.add_hline(
+                y=session[level],
+                line_dash=dash,
+                line_color=_SESSION_COLORS[name],
+                annotation_text=f"{name.upper()} {level}"
+            )
+    
+    fig.update_layout(title=f"{ticker} Session Ranges")
+    
+    # Interactive HTML loads plotly.js from the CDN, no server-side rasterizing
+    return fig.to_html(include_plotlyjs='cdn').encode()
+
+class _RichText:
+    """Plain message text plus bold MessageEntity spans, built incrementally"""
+    
+    def __init__(self):
+        self.parts: List[str] = []
+        self.entities: List[MessageEntity] = []
+        self.offset = 0
+    
+    def add(self, text: str, bold: bool = False) -> '_RichText':
+        # Telegram entity offsets count UTF-16 code units, so emoji take two
+        length = len(text.encode('utf-16-le')) // 2
+        if bold and length:
+            self.entities.append(MessageEntity(MessageEntity.BOLD, self.offset, length))
+        self.parts.append(text)
+        self.offset += length
+        return self
+    
+    def text(self) -> str:
+        return "".join(self.parts)
+
+class _EntityTemplate:
+    """format_map template whose *bold* spans are sent as entities instead of Markdown"""
+    
+    def __init__(self, template: str):
+        # Split on the markers once; odd pieces sit between a pair of '*'
+        pieces = template.lstrip('\n').split('*')
+        self.segments = [(piece, i % 2 == 1) for i, piece in enumerate(pieces) if piece]
+    
+    def render_into(self, rich: _RichText, values: Dict) -> _RichText:
+        for piece, bold in self.segments:
+            rich.add(piece.format_map(values), bold)
+        return rich
+
+# Response templates, filled per request with str.format_map
+_STATUS_TMPL = _EntityTemplate("""
+*{ticker} TRADING SIGNAL* {rocket}
+
+*Current Price:* ${price:.2f}
+*Signal:* {dir_emoji} *{direction}*
+*Confidence Score:* {confidence:.0f}/100 {fire}
+*Expiration:* {expiry}
+
+*Session Analysis:*
+• Asian Range: ${asian:.2f}
+• London Range: ${london:.2f}
+• NY Range: ${ny:.2f}
+
+*Technical Indicators:*
+• RSI: {rsi:.1f}
+• MACD: {macd}
+• Trend: {trend}
+
+*Risk Management:*
+• Stop Loss: ${stop_loss:.2f}
+• Take Profit: ${take_profit:.2f}
+• Risk/Reward: {risk_reward:.2f}:1
+""")
+
+_STATUS_OPTION_TMPL = _EntityTemplate(
+    "{i}. *{opt.type}* ${opt.strike:.2f} (Delta: {opt.delta:.2f}, Est: ${opt.premium_estimate})\n"
+)
+
+_ANALYSIS_TMPL = """
+*{ticker} OPTION ANALYSIS* {money}
+
+*Direction:* {dir_emoji} *{direction}*
+*Confidence:* {confidence:.0f}/100 {fire}
+
+*Recommended Options:*
+"""
+
+_ANALYSIS_OPTION_TMPL = """
+{i}. *{opt.type}* ${opt.strike:.2f}
+   • Delta: {opt.delta:.2f}
+   • Theta: {opt.theta:.3f}
+   • Risk: {opt.risk_level}
+   • Est. Premium: ${opt.premium_estimate}
+   • {opt.description}
+"""
+
+_ANALYSIS_FACTORS_HEADER = "\n*Analysis Factors:*\n"
+
+_PICK_TMPL = _EntityTemplate("""
+*{fire} BEST OPTION PICK {fire}*
+
+*Ticker:* {ticker}
+*Current Price:* ${price:.2f}
+*Expiration:* {expiration}
+
+*Recommended Trade:*
+• *{opt.type}* ${opt.strike:.2f}
+• Delta: {opt.delta:.2f}
+• Theta: {opt.theta:.3f}
+• Risk Level: {opt.risk_level}
+• Est. Premium: ${opt.premium_estimate}
+
+*Trade Rationale:*
+• Direction Signal: {direction} ({confidence:.0f}/100 confidence)
+• {opt.description}
+• Max Profit: Unlimited
+• Max Loss: Premium Paid
+
+*Risk Management:*
+• Stop Loss: ${stop_loss:.2f} (Underlying)
+• Take Profit: ${take_profit:.2f} (Underlying)
+• Risk/Reward: {risk_reward:.2f}:1
+
+*Key Factors:*
+""")
+
+def _chain_frame(chain_data: Dict) -> pd.DataFrame:
+    """Tradier chain payload as a DataFrame with a numeric strike column"""
+    chain = pd.DataFrame(chain_data['options']['option'])
+    chain['strike'] = chain['strike'].astype(float)
+    return chain
+
+def _with_quotes(rows: pd.DataFrame) -> pd.DataFrame:
+    """rows with numeric bid/ask and their mid; run on the selected strikes, not the chain"""
+    # Quotes can be null off-hours; coerce the whole column at once instead of per row
+    bid = pd.to_numeric(rows['bid'], errors='coerce').fillna(0.0).to_numpy()
+    ask = pd.to_numeric(rows['ask'], errors='coerce').fillna(0.0).to_numpy()
+    mid = np.where((bid > 0) & (ask > 0), (bid + ask) * 0.5, 0.0)
+    return rows.assign(bid=bid, ask=ask, mid=mid)
+
+def _nearest_strikes(chain: pd.DataFrame, price: float, k: int = 5) -> Dict[str, pd.DataFrame]:
+    """Per option_type, the rows with the k strikes nearest price, nearest first"""
+    # One distance pass over the whole chain, then an O(n) partial selection per side
+    distance = np.abs(chain['strike'].to_numpy() - price)
+    sides = chain['option_type'].to_numpy()
+    nearest = {}
+    for side in ('call', 'put'):
+        idx = np.flatnonzero(sides == side)
+        if len(idx) > k:
+            idx = idx[np.argpartition(distance[idx], k - 1)[:k]]
+        nearest[side] = chain.iloc[idx[np.argsort(distance[idx])]]
+    return nearest
+
+def _fridays_after(today: datetime, offsets) -> np.ndarray:
+    """Fridays strictly after today, offsets counted in weeks from the first one"""
+    # Starting the day after keeps a Friday from counting as its own next Friday
+    tomorrow = np.datetime64(today.date(), 'D') + 1
+    return np.busday_offset(tomorrow, offsets, roll='forward', weekmask='Fri')
+
+@functools.lru_cache(maxsize=8)
+def _next_friday_for(today_ordinal: int) -> str:
+    """Next Friday after the given day, memoized per calendar day"""
+    return str(_fridays_after(datetime.fromordinal(today_ordinal), 0))
+
 class EnhancedTradingBot:
+    # Depends only on the static emoji set, so build it once per process
+    DIRECTION_EMOJI = {
+        'CALL': f"{Config.EMOJI['bull']} {Config.EMOJI['up']}",
+        'PUT': f"{Config.EMOJI['bear']} {Config.EMOJI['down']}",
+        'NEUTRAL': Config.EMOJI['neutral']
+    }
+    
     def __init__(self):
         self.analyzer = EnhancedSessionRangeAnalyzer()
-        self.tradier = TradierAPI()
         self.emoji = Config.EMOJI
         
-    def format_option_analysis(self, ticker: str, direction: str, confidence: float, 
-                              options: List[Dict], reasoning: List[str]) -> str:
-        """Format option analysis for display"""
-        direction_emoji = {
-            'CALL': f"{self.emoji['bull']} {self.emoji['up']}",
-            'PUT': f"{self.emoji['bear']} {self.emoji['down']}",
-            'NEUTRAL': self.emoji['neutral']
-        }
+        # Shared HTTP session so yfinance and Tradier reuse keep-alive connections
+        self.http = requests.Session()
+        self.http.mount('https://', HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504])
+        ))
+        self.hist_cache = TTLCache(maxsize=256, ttl=60)
+        self.price_cache = TTLCache(maxsize=512, ttl=300)
+        self.exp_cache = TTLCache(maxsize=512, ttl=300)
+        # Only the front expiration matters to /status and /pick, and it changes daily at most
+        self.next_exp_cache = TTLCache(maxsize=512, ttl=3600)
+        self.ticker_cache = TTLCache(maxsize=512, ttl=60)
+        # TTLCache is not thread-safe and the fetch helpers run in worker threads
+        self._cache_lock = threading.Lock()
+        self._fetch_locks: Dict[tuple, threading.Lock] = {}
+        # Last known window per (ticker, period, interval); bounded since tickers are user input
+        self.bars_cache = LRUCache(maxsize=256)
+        # Disk layer under the memory caches, survives restarts
+        self.file_cache = FileCache(Config.CACHE_DIR)
+        self.tradier = TradierAPI(session=self.http, file_cache=self.file_cache)
+        self._hist_batch: Dict[str, asyncio.Future] = {}
+        self._hist_batch_task = None
+        # Tickers of the batch currently downloading, so repeat requests join it
+        self._hist_inflight: Dict[str, asyncio.Future] = {}
+        # yf.download collects results in module-global state, so only one may run at a time
+        self._download_lock = threading.Lock()
+        self.session_cache = LRUCache(maxsize=256)
+        self.chart_cache = TTLCache(maxsize=64, ttl=Config.CHART_CACHE_TTL)
+        # (user id, ticker) -> last /status results, for its buttons
+        self.analysis_cache = TTLCache(maxsize=1024, ttl=Config.ANALYSIS_CACHE_TTL)
+        self.pool = ThreadPoolExecutor(max_workers=8)
+        # Spawned, not forked: a fork could copy a lock held by one of our threads and deadlock
+        self.chart_pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('spawn'))
+        self._send_sem = asyncio.Semaphore(Config.TELEGRAM_MAX_CONCURRENT_SENDS)
+        self._last_per_chat = TTLCache(maxsize=10000, ttl=60)
+        
+        # Ticker-independent rows, built once and shared by every keyboard
+        self._close_chain_row = [InlineKeyboardButton(f"{self.emoji['cross']} Close", callback_data="close|chain")]
+        self._cancel_trade_row = [InlineKeyboardButton(f"{self.emoji['cross']} Cancel", callback_data="cancel|trade")]
+        self._cancel_buy_row = [InlineKeyboardButton(f"{self.emoji['cross']} Cancel", callback_data="cancel|buy")]
         
-        analysis = f"""
-*{ticker} OPTION ANALYSIS* {self.emoji['money']}
+        # /status keyboard skeletons as (label, callback template) pairs; only the ticker varies
+        common_rows = [
+            [(f"{self.emoji['chart']} Detailed Analysis", "analyze|{T}"),
+             (f"{self.emoji['calendar']} Option Chain", "chain|{T}")],
+            [(f"{self.emoji['clock']} Set Alert", "alert|{T}"),
+             (f"{self.emoji['warning']} Risk Check", "risk|{T}")]
+        ]
+        self._status_rows = {
+            'CALL': [[(f"{self.emoji['money']} Buy CALL", "buy|{T}|call"),
+                      (f"{self.emoji['chart']} View CALLs", "view|{T}|calls")]] + common_rows,
+            'PUT': [[(f"{self.emoji['money']} Buy PUT", "buy|{T}|put"),
+                     (f"{self.emoji['chart']} View PUTs", "view|{T}|puts")]] + common_rows,
+            'NEUTRAL': common_rows
+        }
+        # Callback data is "action|arg|arg...", dispatched as action -> (handler, number of arguments)
+        self._cb_dispatch = {
+            'buy': (self.show_buy_options, 2),
+            'view': (self.show_option_details, 2),
+            'chain': (self.show_chain, 1),
+            'analyze': (self.show_analysis, 1),
+            'select': (self.confirm_trade, 4),
+            'trade': (self.place_trade, 4),
+            'close': (self.close_message, 1),
+            'cancel': (self.close_message, 1),
+        }
+        self._welcome_text = f"""
+*Welcome to the Enhanced Trading Bot* {self.emoji['rocket']}
 
-*Direction:* {direction_emoji[direction]} *{direction}*
-*Confidence:* {confidence:.0f}/100 {self.emoji['fire'] if confidence > 70 else ''}
+Session-range analysis with option picks, powered by Tradier.
 
-*Recommended Options:*
+*Commands:*
+• `/status TICKER` - Trading signal with TP/SL {self.emoji['chart']}
+• `/analyze TICKER` - Session chart and detailed analysis {self.emoji['up']}
+• `/options TICKER` - Nearest strikes in the option chain {self.emoji['calendar']}
+• `/pick TICKER [EXPIRATION]` - Best option pick {self.emoji['fire']}
+• `/trade TICKER CALL|PUT [EXPIRATION]` - Choose a strike to trade {self.emoji['money']}
+• `/positions` - Open positions and P&L {self.emoji['check']}
+• `/help` - Show this message
+
+{self.emoji['warning']} Options trading involves significant risk.
 """
         
-        for i, option in enumerate(options[:3], 1):
-            premium = option.get('premium_estimate', 'N/A')
-            analysis += f"""
-{i}. *{option['type']}* ${option['strike']:.2f}
-   • Delta: {option['delta']:.2f}
-   • Theta: {option['theta']:.3f}
-   • Risk: {option['risk_level']}
-   • Est. Premium: ${premium}
-   • {option['description']}
-"""
+    def _cached(self, cache: TTLCache, key, fetch):
+        """Return cache[key], running fetch() at most once at a time per key"""
+        with self._cache_lock:
+            value = cache.get(key)
+        if value is not None:
+            return value
+        
+        # Concurrent misses on the same key wait here instead of refetching
+        lock_key = (id(cache), key)
+        with self._cache_lock:
+            fetch_lock = self._fetch_locks.setdefault(lock_key, threading.Lock())
+        try:
+            with fetch_lock:
+                with self._cache_lock:
+                    value = cache.get(key)
+                if value is None:
+                    value = fetch()
+                    if len(value):
+                        with self._cache_lock:
+                            cache[key] = value
+        finally:
+            # Waiters already hold this lock object and will find the cached value;
+            # dropping the entry keeps one lock per user-typed ticker from piling up
+            with self._cache_lock:
+                if self._fetch_locks.get(lock_key) is fetch_lock:
+                    del self._fetch_locks[lock_key]
+        return value
+    
+    def _get_ticker(self, ticker: str) -> yf.Ticker:
+        """Shared yf.Ticker per symbol so one request's calls reuse its state"""
+        with self._cache_lock:
+            stock = self.ticker_cache.get(ticker)
+            if stock is None:
+                stock = self.ticker_cache[ticker] = yf.Ticker(ticker, session=self.http)
+        return stock
+    
+    def _get_hist(self, ticker: str, period: str = '5d', interval: str = '15m') -> pd.DataFrame:
+        """Get price history, served from cache while fresh"""
+        return self._cached(
+            self.hist_cache, (ticker, period, interval),
+            lambda: self._fetch_hist(ticker, period, interval)
+        )
+    
+    def _fetch_hist(self, ticker: str, period: str, interval: str) -> pd.DataFrame:
+        """Download price history, only fetching new bars when a window is known"""
+        key = (ticker, period, interval)
+        stock = self._get_ticker(ticker)
+        with self._cache_lock:
+            bars = self.bars_cache.get(key)
+        if bars is None:
+            # A recent window on disk lets a restarted bot refresh just the tail
+            bars = self.file_cache.get('history', ticker, period, interval, ttl=Config.HISTORY_DISK_TTL)
+        if bars is not None and bars.index.tz is None:
+            # Naive windows (from tz-dropping downloads) cannot be placed in time; start over
+            bars = None
+        if bars is None:
+            hist = stock.history(period=period, interval=interval)
+        else:
+            # Only the tail moves, so refetch from the last (possibly partial) bar
+            delta = stock.history(start=bars.index[-1], interval=interval)
+            if delta.empty:
+                hist = bars
+            else:
+                # Same instants either way, but concat needs one tz to keep a DatetimeIndex
+                hist = pd.concat([bars.iloc[:-1].tz_convert(delta.index.tz), delta])
+                hist = hist[~hist.index.duplicated(keep='last')].tail(len(bars))
+        
+        if not hist.empty:
+            with self._cache_lock:
+                self.bars_cache[key] = hist
+            self.file_cache.put('history', ticker, period, interval, value=hist)
+        return hist
+    
+    async def _batched_hist(self, ticker: str) -> pd.DataFrame:
+        """Get default history, coalescing concurrent cold fetches into one download"""
+        key = (ticker, '5d', '15m')
+        with self._cache_lock:
+            warm = key in self.bars_cache
+        warm = warm or await asyncio.to_thread(
+            self.file_cache.fresh, 'history', *key, ttl=Config.HISTORY_DISK_TTL
+        )
+        if warm:
+            # Warm tickers refresh incrementally through the per-ticker path
+            return await asyncio.to_thread(self._get_hist, ticker)
         
-        analysis += f"\n*Analysis Factors:*\n"
-        for i, reason in enumerate(reasoning[:5], 1):
-            analysis += f"{i}. {reason}\n"
+        fut = self._hist_batch.get(ticker) or self._hist_inflight.get(ticker)
+        if fut is None:
+            fut = asyncio.get_running_loop().create_future()
+            self._hist_batch[ticker] = fut
+            if len(self._hist_batch) == 1:
+                self._hist_batch_task = asyncio.create_task(self._flush_hist_batch())
+        # Shielded: a cancelled handler must not cancel the future other handlers share
+        hist = await asyncio.shield(fut)
+        if hist.empty:
+            # The batch had nothing usable for this ticker; give it the per-ticker history() path
+            return await asyncio.to_thread(self._get_hist, ticker)
+        return hist
+    
+    async def _flush_hist_batch(self):
+        """Download every ticker queued during the batch window in one request"""
+        await asyncio.sleep(Config.HISTORY_BATCH_WINDOW)
+        batch, self._hist_batch = self._hist_batch, {}
+        self._hist_inflight.update(batch)
+        
+        try:
+            frames = await asyncio.to_thread(self._multi_hist, list(batch))
+        except Exception as e:
+            for fut in batch.values():
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        finally:
+            for ticker in batch:
+                self._hist_inflight.pop(ticker, None)
+        
+        for ticker, fut in batch.items():
+            hist = frames.get(ticker, pd.DataFrame())
+            if not hist.empty:
+                key = (ticker, '5d', '15m')
+                with self._cache_lock:
+                    self.hist_cache[key] = hist
+                    self.bars_cache[key] = hist
+            if not fut.done():
+                fut.set_result(hist)
+    
+    async def _fetch_bundle(self, ticker: str):
+        """Fetch price history and option expirations concurrently"""
+        return await asyncio.gather(
+            self._batched_hist(ticker),
+            asyncio.to_thread(self.get_option_expirations, ticker)
+        )
+    
+    def _session_ranges(self, bars: Bars, ticker: str) -> Dict:
+        """Session analysis for bars, reused while the bars are unchanged"""
+        key = (ticker, len(bars), bars.index[-1].value, bars.close[-1])
+        with self._cache_lock:
+            session_data = self.session_cache.get(key)
+        if session_data is None:
+            session_data = self.analyzer.calculate_session_ranges(bars, ticker)
+            with self._cache_lock:
+                self.session_cache[key] = session_data
+        return session_data
+    
+    def _multi_hist(self, tickers: List[str], period: str = '5d', interval: str = '15m') -> Dict[str, pd.DataFrame]:
+        """Download history for several tickers in one batched request"""
+        # A second batch queues here rather than racing the first through yfinance's shared state
+        with self._download_lock:
+            # download() drops the timezone for intraday intervals by default; the session
+            # analysis converts to US/Eastern and needs tz-aware bars like history() returns
+            df = yf.download(
+                tickers, period=period, interval=interval, group_by='ticker',
+                threads=True, session=self.http, progress=False, ignore_tz=False
+            )
+        if len(tickers) == 1:
+            frames = {tickers[0]: df.dropna()}
+        else:
+            frames = {t: df[t].dropna() for t in tickers if t in df.columns.get_level_values(0)}
         
-        return analysis
+        # Never hand out or cache naive bars: the session analysis needs tz-aware ones
+        frames = {t: hist for t, hist in frames.items() if not hist.empty and hist.index.tz is not None}
+        for ticker, hist in frames.items():
+            self.file_cache.put('history', ticker, period, interval, value=hist)
+        return frames
+    
+    def _fetch_price(self, ticker: str) -> Dict:
+        """Last price from fast_info, a much smaller payload than .info"""
+        try:
+            price = self._get_ticker(ticker).fast_info.last_price
+        except Exception as e:
+            # fast_info occasionally raises for thinly traded tickers
+            logger.warning("fast_info unavailable for %s: %s", ticker, e)
+            return {}
+        return {'last_price': float(price)} if price else {}
+    
+    def _get_price(self, ticker: str, default: float = 0) -> float:
+        """Get last market price, served from cache while fresh"""
+        quote = self._cached(self.price_cache, ticker, lambda: self._fetch_price(ticker))
+        return quote.get('last_price', default)
+        
+    async def _send(self, method, chat_id, *args, **kwargs):
+        """Call a Telegram send method, pacing messages per chat to avoid 429s"""
+        # Reserve the next slot for this chat before sleeping so bursts queue in order
+        now = time.monotonic()
+        send_at = max(now, self._last_per_chat.get(chat_id, 0) + Config.TELEGRAM_CHAT_INTERVAL)
+        self._last_per_chat[chat_id] = send_at
+        await asyncio.sleep(send_at - now)
+        
+        async with self._send_sem:
+            return await method(*args, **kwargs)
+    
+    def _progress(self, message, text, previous: Optional[asyncio.Task] = None) -> Optional[asyncio.Task]:
+        """Start a fire-and-forget interim edit of a loading message; returns the edit in flight"""
+        # Skip rather than queue: a busy chat or an unfinished earlier edit just misses this update
+        if previous is not None and not previous.done():
+            return previous
+        if self._last_per_chat.get(message.chat_id, 0) + Config.TELEGRAM_CHAT_INTERVAL > time.monotonic():
+            return previous
+        return asyncio.create_task(self._progress_edit(message, text))
+    
+    async def _progress_edit(self, message, text):
+        """Edit outside the per-chat pacing, so it never reserves the slot the result needs"""
+        try:
+            async with self._send_sem:
+                await message.edit_text(text)
+        except Exception as e:
+            logger.warning("Progress edit failed in chat %s: %s", message.chat_id, e)
+    
+    
+    @functools.lru_cache(maxsize=512)
+    def _status_keyboard(self, ticker: str, direction: str) -> InlineKeyboardMarkup:
+        """Build the /status action keyboard, cached per ticker and direction"""
+        return InlineKeyboardMarkup([
+            [InlineKeyboardButton(label, callback_data=data.format(T=ticker)) for label, data in row]
+            for row in self._status_rows[direction]
+        ])
+    
+    def format_option_analysis(self, ticker: str, direction: str, confidence: float, 
+                              options: List[Opt], reasoning: List[str]) -> str:
+        """Format option analysis for display"""
+        parts = [_ANALYSIS_TMPL.format_map({
+            'ticker': ticker,
+            'money': self.emoji['money'],
+            'dir_emoji': self.DIRECTION_EMOJI[direction],
+            'direction': direction,
+            'confidence': confidence,
+            'fire': self.emoji['fire'] if confidence > 70 else ''
+        })]
+        
+        for i, option in enumerate(islice(options, 3), 1):
+            parts.append(_ANALYSIS_OPTION_TMPL.format_map({'i': i, 'opt': option}))
+        
+        parts.append(_ANALYSIS_FACTORS_HEADER)
+        for i, reason in enumerate(islice(reasoning, 5), 1):
+            parts.append(f"{i}. {reason}\n")
+        
+        return "".join(parts)
+    
+    async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /start and /help commands"""
+        await self._send(update.message.reply_text, update.effective_chat.id, self._welcome_text, parse_mode='Markdown')
     
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Enhanced /status command with option recommendations"""
         try:
             if not context.args:
-                await update.message.reply_text(
+                await self._send(
+                    update.message.reply_text, update.effective_chat.id,
                     f"{self.emoji['warning']} Please provide a ticker. Example: `/status SPY`",
                     parse_mode='Markdown'
                 )
@@ -75,42 +570,55 @@ class EnhancedTradingBot:
             ticker = context.args[0].upper()
             
             # Show loading message
-            loading_msg = await update.message.reply_text(
+            loading_msg = await self._send(
+                update.message.reply_text, update.effective_chat.id,
                 f"{self.emoji['chart']} Analyzing {ticker} for option opportunities..."
             )
             
-            # Get historical data
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period='5d', interval='15m')
+            # The expiration only feeds the option picks, so its request overlaps the analysis
+            expiry_task = asyncio.ensure_future(asyncio.to_thread(self.get_next_option_expiration, ticker))
+            try:
+                hist = await self._batched_hist(ticker)
+            except BaseException:
+                # Nobody will await the expiration now; cancel it so its errors are not left unretrieved
+                expiry_task.cancel()
+                raise
             
             if hist.empty:
-                await loading_msg.edit_text(f"{self.emoji['cross']} No data found for {ticker}")
+                expiry_task.cancel()
+                await self._send(loading_msg.edit_text, loading_msg.chat_id, f"{self.emoji['cross']} No data found for {ticker}")
                 return
             
-            current_price = stock.info.get('regularMarketPrice', hist['Close'].iloc[-1])
+            # The last 15m close is already in memory; skip the slow quoteSummary call
+            bars = Bars.from_df(hist)
+            current_price = float(bars.close[-1])
             
-            # Enhanced analysis
-            session_data = self.analyzer.calculate_session_ranges(hist, ticker)
+            # Phase A: session analysis in a worker thread while the expiration loads
+            progress = self._progress(
+                loading_msg, f"{self.emoji['chart']} {ticker} ${current_price:.2f}, computing session ranges..."
+            )
+            session_data, next_expiry = await asyncio.gather(
+                asyncio.to_thread(self._session_ranges, bars, ticker),
+                expiry_task
+            )
             direction, confidence, trade_type, reasoning = self.analyzer.determine_direction(
                 current_price, session_data, session_data['momentum']
             )
             
-            # Get next expiration
-            expirations = self.get_option_expirations(ticker)
-            next_expiry = expirations[0] if expirations else self.get_next_friday()
-            
-            # Pick optimal options
-            options = self.analyzer.option_picker(
-                ticker, direction, current_price, next_expiry
+            # Phase B: option picks and ATR are independent of each other
+            progress = self._progress(
+                loading_msg, f"{self.emoji['chart']} {ticker} looks {direction} ({confidence:.0f}%), picking options...",
+                progress
             )
-            
-            # Calculate TP/SL
-            high_low = hist['High'] - hist['Low']
-            high_close = abs(hist['High'] - hist['Close'].shift())
-            low_close = abs(hist['Low'] - hist['Close'].shift())
-            ranges = pd.concat([high_low, high_close, low_close], axis=1)
-            true_range = ranges.max(axis=1)
-            atr = true_range.rolling(window=14).mean().iloc[-1]
+            picks = asyncio.to_thread(
+                self.analyzer.option_picker, ticker, direction, current_price, next_expiry
+            )
+            if direction == 'NEUTRAL':
+                # NEUTRAL TP/SL levels are fixed percentages, the last bar's range stands in for ATR
+                options = await picks
+                atr = float(bars.high[-1] - bars.low[-1])
+            else:
+                options, atr = await asyncio.gather(picks, asyncio.to_thread(atr_last, bars, 14))
             
             tp_sl = self.analyzer.calculate_tp_sl(
                 current_price, direction, atr, confidence,
@@ -118,92 +626,144 @@ class EnhancedTradingBot:
             )
             
             # Format response
-            response = f"""
-*{ticker} TRADING SIGNAL* {self.emoji['rocket']}
-
-*Current Price:* ${current_price:.2f}
-*Signal:* {direction_emoji[direction]} *{direction}*
-*Confidence Score:* {confidence:.0f}/100 {self.emoji['fire'] if confidence > 70 else ''}
-*Expiration:* {next_expiry}
-
-*Session Analysis:*
-• Asian Range: ${session_data['sessions'].get('asian', {}).get('range', 0):.2f}
-• London Range: ${session_data['sessions'].get('london', {}).get('range', 0):.2f}
-• NY Range: ${session_data['sessions'].get('ny', {}).get('range', 0):.2f}
-
-*Technical Indicators:*
-• RSI: {session_data['momentum']['rsi']:.1f}
-• MACD: {'Bullish' if session_data['momentum']['macd_hist'] > 0 else 'Bearish'}
-• Trend: {session_data['momentum']['trend']}
-
-*Risk Management:*
-• Stop Loss: ${tp_sl['stop_loss']:.2f}
-• Take Profit: ${tp_sl['take_profit']:.2f}
-• Risk/Reward: {tp_sl['risk_reward']:.2f}:1
-"""
+            sessions = session_data['sessions']
+            momentum = session_data['momentum']
+            rich = _STATUS_TMPL.render_into(_RichText(), dict(
+                rocket=self.emoji['rocket'],
+                ticker=ticker,
+                price=current_price,
+                dir_emoji=self.DIRECTION_EMOJI[direction],
+                direction=direction,
+                confidence=confidence,
+                fire=self.emoji['fire'] if confidence > 70 else '',
+                expiry=next_expiry,
+                asian=sessions.get('asian', {}).get('range', 0),
+                london=sessions.get('london', {}).get('range', 0),
+                ny=sessions.get('ny', {}).get('range', 0),
+                rsi=momentum['rsi'],
+                macd='Bullish' if momentum['macd_hist'] > 0 else 'Bearish',
+                trend=momentum['trend'],
+                stop_loss=tp_sl['stop_loss'],
+                take_profit=tp_sl['take_profit'],
+                risk_reward=tp_sl['risk_reward']
+            ))
             
             # Add option recommendations
             if direction != 'NEUTRAL' and options:
-                response += f"\n*Recommended Options:*\n"
-                for i, opt in enumerate(options[:2], 1):
-                    premium = opt.get('premium_estimate', 'N/A')
-                    response += f"{i}. *{opt['type']}* ${opt['strike']:.2f}"
-                    response += f" (Delta: {opt['delta']:.2f}, Est: ${premium})\n"
+                rich.add("\n").add("Recommended Options:", bold=True).add("\n")
+                for i, opt in enumerate(islice(options, 2), 1):
+                    _STATUS_OPTION_TMPL.render_into(rich, {'i': i, 'opt': opt})
             
             # Add reasoning
             if reasoning:
-                response += f"\n*Key Factors:*\n"
-                for i, reason in enumerate(reasoning[:3], 1):
-                    response += f"{i}. {reason}\n"
+                rich.add("\n").add("Key Factors:", bold=True).add("\n")
+                for i, reason in enumerate(islice(reasoning, 3), 1):
+                    rich.add(f"{i}. {reason}\n")
             
-            # Create interactive keyboard
-            keyboard = []
+            reply_markup = self._status_keyboard(ticker, direction)
+            # The Buy buttons below need this price, spare them a quote fetch
+            context.user_data[f"price_{ticker}"] = (current_price, time.monotonic())
+            # ...and Detailed Analysis reuses this run's result, rendered only if it is pressed
+            self.analysis_cache[(update.effective_user.id, ticker)] = (direction, confidence, options, reasoning)
             
-            if direction == 'CALL':
-                keyboard.append([
-                    InlineKeyboardButton(f"{self.emoji['money']} Buy CALL", 
-                                       callback_data=f"buy_{ticker}_call"),
-                    InlineKeyboardButton(f"{self.emoji['chart']} View CALLs", 
-                                       callback_data=f"view_{ticker}_calls")
-                ])
-            elif direction == 'PUT':
-                keyboard.append([
-                    InlineKeyboardButton(f"{self.emoji['money']} Buy PUT", 
-                                       callback_data=f"buy_{ticker}_put"),
-                    InlineKeyboardButton(f"{self.emoji['chart']} View PUTs", 
-                                       callback_data=f"view_{ticker}_puts")
-                ])
+            # A progress edit still in flight must not land on top of the result
+            if progress is not None:
+                progress.cancel()
             
-            keyboard.extend([
-                [
-                    InlineKeyboardButton(f"{self.emoji['chart']} Detailed Analysis", 
-                                       callback_data=f"analyze_{ticker}"),
-                    InlineKeyboardButton(f"{self.emoji['calendar']} Option Chain", 
-                                       callback_data=f"chain_{ticker}")
-                ],
-                [
-                    InlineKeyboardButton(f"{self.emoji['clock']} Set Alert", 
-                                       callback_data=f"alert_{ticker}"),
-                    InlineKeyboardButton(f"{self.emoji['warning']} Risk Check", 
-                                       callback_data=f"risk_{ticker}")
-                ]
-            ])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await loading_msg.edit_text(response, parse_mode='Markdown', reply_markup=reply_markup)
+            # Plain text with entities: no server-side Markdown parse, nothing to escape
+            await self._send(
+                loading_msg.edit_text, loading_msg.chat_id, rich.text(),
+                entities=rich.entities, reply_markup=reply_markup
+            )
             
         except Exception as e:
-            logger.error(f"Error in status command: {e}")
-            await update.message.reply_text(
+            logger.exception("status_command failed for %s", context.args)
+            await self._send(
+                update.message.reply_text, update.effective_chat.id,
                 f"{self.emoji['cross']} Error analyzing {ticker}: {str(e)}"
             )
     
+    async def _chain_view(self, ticker: str, price) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+        """Nearest-strike chain text and keyboard; price is an awaitable for the current price"""
+        # Expirations and price are independent, fetch them together
+        expirations, current_price = await asyncio.gather(
+            asyncio.to_thread(self.get_option_expirations, ticker),
+            price
+        )
+        if not expirations:
+            return f"No options available for {ticker}", None
+        
+        # Get option chain from Tradier
+        next_expiry = expirations[0]
+        # A handful of contract quotes instead of the whole chain payload
+        chain_data = await asyncio.to_thread(self.tradier.get_options_chain_near, ticker, next_expiry, current_price)
+        
+        if 'options' not in chain_data:
+            return f"No option data for {ticker}", None
+        
+        # Format option chain
+        parts = [f"""
+*{ticker} OPTION CHAIN* {self.emoji['money']}
+*Expiration:* {next_expiry}
+*Current Price:* ${current_price:.2f}
+
+*CALLS (Bullish)* {self.emoji['bull']}
+"""]
+        
+        # Parse the chain once, then pick the nearest strikes per side
+        chain = _chain_frame(chain_data)
+        nearest = _nearest_strikes(chain, current_price)
+        calls = _with_quotes(nearest['call']).to_dict('records')
+        puts = _with_quotes(nearest['put']).to_dict('records')
+        
+        # Show nearest strikes for calls
+        for call in calls:
+            strike = call['strike']
+            parts.append(f"""
+• ${strike:.2f}: Bid ${call['bid']:.2f} | Ask ${call['ask']:.2f}
+  Mid: ${call['mid']:.2f} | {'ITM' if strike < current_price else 'OTM'}
+""")
+        
+        parts.append(f"\n*PUTS (Bearish)* {self.emoji['bear']}\n")
+        
+        # Show nearest strikes for puts
+        for put in puts:
+            strike = put['strike']
+            parts.append(f"""
+• ${strike:.2f}: Bid ${put['bid']:.2f} | Ask ${put['ask']:.2f}
+  Mid: ${put['mid']:.2f} | {'ITM' if strike > current_price else 'OTM'}
+""")
+        
+        # Create selection keyboard
+        keyboard = []
+        for call in islice(calls, 3):
+            strike = call['strike']
+            keyboard.append([
+                InlineKeyboardButton(
+                    f"CALL ${strike:.2f}",
+                    callback_data=f"select|{ticker}|call|{strike}|{next_expiry}"
+                )
+            ])
+        
+        for put in islice(puts, 3):
+            strike = put['strike']
+            keyboard.append([
+                InlineKeyboardButton(
+                    f"PUT ${strike:.2f}",
+                    callback_data=f"select|{ticker}|put|{strike}|{next_expiry}"
+                )
+            ])
+        
+        keyboard.append(self._close_chain_row)
+        
+        return "".join(parts), InlineKeyboardMarkup(keyboard)
+    
     async def options_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /options command to show option chain"""
         try:
             if not context.args:
-                await update.message.reply_text(
+                await self._send(
+                    update.message.reply_text, update.effective_chat.id,
                     f"{self.emoji['warning']} Usage: `/options TICKER`\nExample: `/options SPY`",
                     parse_mode='Markdown'
                 )
@@ -211,105 +771,24 @@ class EnhancedTradingBot:
             
             ticker = context.args[0].upper()
             
-            loading_msg = await update.message.reply_text(
+            loading_msg = await self._send(
+                update.message.reply_text, update.effective_chat.id,
                 f"{self.emoji['calendar']} Fetching option chain for {ticker}..."
             )
             
-            # Get option chain from Tradier
-            expirations = self.get_option_expirations(ticker)
-            if not expirations:
-                await loading_msg.edit_text(f"No options available for {ticker}")
-                return
-            
-            next_expiry = expirations[0]
-            chain_data = self.tradier.get_options_chain(ticker, next_expiry)
-            
-            if 'options' not in chain_data:
-                await loading_msg.edit_text(f"No option data for {ticker}")
-                return
-            
-            # Get current price
-            stock = yf.Ticker(ticker)
-            current_price = stock.info.get('regularMarketPrice', 0)
-            
-            # Format option chain
-            response = f"""
-*{ticker} OPTION CHAIN* {self.emoji['money']}
-*Expiration:* {next_expiry}
-*Current Price:* ${current_price:.2f}
-
-*CALLS (Bullish)* {self.emoji['bull']}
-"""
-            
-            options = chain_data['options']['option']
-            calls = [opt for opt in options if opt['option_type'] == 'call']
-            puts = [opt for opt in options if opt['option_type'] == 'put']
-            
-            # Show nearest strikes for calls
-            calls.sort(key=lambda x: abs(float(x['strike']) - current_price))
-            for call in calls[:5]:
-                strike = float(call['strike'])
-                bid = call.get('bid', 0)
-                ask = call.get('ask', 0)
-                mid = (float(bid) + float(ask)) / 2 if bid and ask else 0
-                
-                response += f"""
-• ${strike:.2f}: Bid ${bid} | Ask ${ask}
-  Mid: ${mid:.2f} | {'ITM' if strike < current_price else 'OTM'}
-"""
-            
-            response += f"\n*PUTS (Bearish)* {self.emoji['bear']}\n"
-            
-            # Show nearest strikes for puts
-            puts.sort(key=lambda x: abs(float(x['strike']) - current_price))
-            for put in puts[:5]:
-                strike = float(put['strike'])
-                bid = put.get('bid', 0)
-                ask = put.get('ask', 0)
-                mid = (float(bid) + float(ask)) / 2 if bid and ask else 0
-                
-                response += f"""
-• ${strike:.2f}: Bid ${bid} | Ask ${ask}
-  Mid: ${mid:.2f} | {'ITM' if strike > current_price else 'OTM'}
-"""
-            
-            # Create selection keyboard
-            keyboard = []
-            for call in calls[:3]:
-                strike = float(call['strike'])
-                keyboard.append([
-                    InlineKeyboardButton(
-                        f"CALL ${strike:.2f}",
-                        callback_data=f"select_{ticker}_call_{strike}_{next_expiry}"
-                    )
-                ])
-            
-            for put in puts[:3]:
-                strike = float(put['strike'])
-                keyboard.append([
-                    InlineKeyboardButton(
-                        f"PUT ${strike:.2f}",
-                        callback_data=f"select_{ticker}_put_{strike}_{next_expiry}"
-                    )
-                ])
-            
-            keyboard.append([
-                InlineKeyboardButton(f"{self.emoji['cross']} Close", callback_data="close_chain")
-            ])
-            
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            await loading_msg.edit_text(response, parse_mode='Markdown', reply_markup=reply_markup)
+            text, reply_markup = await self._chain_view(ticker, asyncio.to_thread(self._get_price, ticker))
+            await self._send(loading_msg.edit_text, loading_msg.chat_id, text, parse_mode='Markdown', reply_markup=reply_markup)
             
         except Exception as e:
-            logger.error(f"Error in options command: {e}")
-            await update.message.reply_text(f"Error fetching options: {str(e)}")
+            logger.exception("options_command failed for %s", context.args)
+            await self._send(update.message.reply_text, update.effective_chat.id, f"Error fetching options: {str(e)}")
     
     async def pick_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /pick command for automated option selection"""
         try:
             if not context.args:
-                await update.message.reply_text(
+                await self._send(
+                    update.message.reply_text, update.effective_chat.id,
                     f"{self.emoji['warning']} Usage: `/pick TICKER [EXPIRATION]`\n"
                     f"Example: `/pick AAPL` or `/pick SPY 2024-01-19`",
                     parse_mode='Markdown'
@@ -317,18 +796,38 @@ class EnhancedTradingBot:
                 return
             
             ticker = context.args[0].upper()
-            expiration = context.args[1] if len(context.args) > 1 else self.get_next_friday()
             
-            loading_msg = await update.message.reply_text(
+            loading_msg = await self._send(
+                update.message.reply_text, update.effective_chat.id,
                 f"{self.emoji['chart']} Picking best option for {ticker}..."
             )
             
-            # Get data and analysis
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period='5d', interval='15m')
-            current_price = stock.info.get('regularMarketPrice', hist['Close'].iloc[-1])
+            if len(context.args) > 1:
+                expiration = context.args[1]
+                hist = await self._batched_hist(ticker)
+            else:
+                # Same default as /status: the nearest listed expiration, not a computed Friday
+                hist, expiration = await asyncio.gather(
+                    self._batched_hist(ticker),
+                    asyncio.to_thread(self.get_next_option_expiration, ticker)
+                )
+            
+            if hist.empty:
+                await self._send(loading_msg.edit_text, loading_msg.chat_id, f"{self.emoji['cross']} No data found for {ticker}")
+                return
+            
+            bars = Bars.from_df(hist)
+            last_close = float(bars.close[-1])
             
-            session_data = self.analyzer.calculate_session_ranges(hist, ticker)
+            # A live 15m bar is as good as a quote; only ask for one when the market is quiet
+            last_ts = bars.index[-1]
+            if (pd.Timestamp.now(tz=last_ts.tz) - last_ts).total_seconds() < Config.PRICE_STALE_AFTER:
+                current_price = last_close
+            else:
+                current_price = await asyncio.to_thread(self._get_price, ticker, last_close)
+            
+            # talib and the timezone conversion are CPU work, keep them off the event loop
+            session_data = await asyncio.to_thread(self._session_ranges, bars, ticker)
             direction, confidence, trade_type, reasoning = self.analyzer.determine_direction(
                 current_price, session_data, session_data['momentum']
             )
@@ -339,7 +838,7 @@ class EnhancedTradingBot:
             )
             
             if not options:
-                await loading_msg.edit_text(f"No suitable options found for {ticker}")
+                await self._send(loading_msg.edit_text, loading_msg.chat_id, f"No suitable options found for {ticker}")
                 return
             
             # Format best option
@@ -351,136 +850,394 @@ class EnhancedTradingBot:
                 option_type=direction
             )
             
-            response = f"""
-*{self.emoji['fire']} BEST OPTION PICK {self.emoji['fire']}
-
-*Ticker:* {ticker}
-*Current Price:* ${current_price:.2f}
-*Expiration:* {expiration}
-
-*Recommended Trade:*
-• *{best_option['type']}* ${best_option['strike']:.2f}
-• Delta: {best_option['delta']:.2f}
-• Theta: {best_option['theta']:.3f}
-• Risk Level: {best_option['risk_level']}
-• Est. Premium: ${best_option.get('premium_estimate', 'N/A')}
-
-*Trade Rationale:*
-• Direction Signal: {direction} ({confidence:.0f}/100 confidence)
-• {best_option['description']}
-• Max Profit: Unlimited
-• Max Loss: Premium Paid
-
-*Risk Management:*
-• Stop Loss: ${tp_sl['stop_loss']:.2f} (Underlying)
-• Take Profit: ${tp_sl['take_profit']:.2f} (Underlying)
-• Risk/Reward: {tp_sl['risk_reward']:.2f}:1
-
-*Key Factors:*
-"""
+            rich = _PICK_TMPL.render_into(_RichText(), dict(
+                opt=best_option,
+                fire=self.emoji['fire'],
+                ticker=ticker,
+                price=current_price,
+                expiration=expiration,
+                direction=direction,
+                confidence=confidence,
+                stop_loss=tp_sl['stop_loss'],
+                take_profit=tp_sl['take_profit'],
+                risk_reward=tp_sl['risk_reward']
+            ))
             
-            for i, reason in enumerate(reasoning[:3], 1):
-                response += f"{i}. {reason}\n"
+            for i, reason in enumerate(islice(reasoning, 3), 1):
+                rich.add(f"{i}. {reason}\n")
             
             # Action buttons
             keyboard = [
                 [
                     InlineKeyboardButton(
                         f"{self.emoji['money']} Place This Trade",
-                        callback_data=f"trade_{ticker}_{best_option['type'].lower()}_{best_option['strike']}_{expiration}"
+                        callback_data=f"trade|{ticker}|{best_option.type.lower()}|{best_option.strike}|{expiration}"
                     )
                 ],
                 [
                     InlineKeyboardButton(
                         f"{self.emoji['chart']} See Alternatives",
-                        callback_data=f"alternatives_{ticker}_{direction}"
+                        callback_data=f"alternatives|{ticker}|{direction}"
                     ),
                     InlineKeyboardButton(
                         f"{self.emoji['warning']} Risk Analysis",
-                        callback_data=f"risk_{ticker}_{best_option['type']}_{best_option['strike']}"
+                        callback_data=f"risk|{ticker}|{best_option.type}|{best_option.strike}"
                     )
                 ]
             ]
             
             reply_markup = InlineKeyboardMarkup(keyboard)
             
-            await loading_msg.edit_text(response, parse_mode='Markdown', reply_markup=reply_markup)
+            await self._send(
+                loading_msg.edit_text, loading_msg.chat_id, rich.text(),
+                entities=rich.entities, reply_markup=reply_markup
+            )
             
         except Exception as e:
-            logger.error(f"Error in pick command: {e}")
-            await update.message.reply_text(f"Error picking option: {str(e)}")
+            logger.exception("pick_command failed for %s", context.args)
+            await self._send(update.message.reply_text, update.effective_chat.id, f"Error picking option: {str(e)}")
     
+    async def trade_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /trade command to pick a strike near the money"""
+        try:
+            if len(context.args) < 2 or context.args[1].upper() not in ('CALL', 'PUT'):
+                await self._send(
+                    update.message.reply_text, update.effective_chat.id,
+                    f"{self.emoji['warning']} Usage: `/trade TICKER CALL|PUT [EXPIRATION]`\n"
+                    f"Example: `/trade SPY CALL` or `/trade AAPL PUT 2024-01-19`",
+                    parse_mode='Markdown'
+                )
+                return
+
+            ticker = context.args[0].upper()
+            option_type = context.args[1].lower()
+            expiration = context.args[2] if len(context.args) > 2 else self.get_next_friday()
+
+            loading_msg = await self._send(
+                update.message.reply_text, update.effective_chat.id,
+                f"{self.emoji['calendar']} Loading {ticker} {option_type.upper()} strikes..."
+            )
+
+            # The strike list and price are independent, fetch them in parallel
+            loop = asyncio.get_running_loop()
+            strikes_fut = loop.run_in_executor(
+                self.pool, self.tradier.get_option_strikes, ticker, expiration
+            )
+            hist_fut = loop.run_in_executor(self.pool, self._get_hist, ticker, '1d')
+            strikes, hist = await asyncio.gather(strikes_fut, hist_fut)
+
+            if hist.empty:
+                await self._send(loading_msg.edit_text, loading_msg.chat_id, f"{self.emoji['cross']} No data found for {ticker}")
+                return
+
+            current_price = float(hist['Close'].iloc[-1])
+            # Then quote only the nearest contracts on the requested side, not the whole chain
+            chain_data = await loop.run_in_executor(
+                self.pool, functools.partial(
+                    self.tradier.get_options_chain_near, ticker, expiration, current_price,
+                    option_types=(option_type,), strikes=strikes
+                )
+            )
+
+            if not isinstance(chain_data.get('options'), dict):
+                await self._send(loading_msg.edit_text, loading_msg.chat_id, f"No option data for {ticker} {expiration}")
+                return
+
+            # Same columnar chain path as /options, then order the 5 nearest by strike
+            nearest = _nearest_strikes(_chain_frame(chain_data), current_price)[option_type]
+            if nearest.empty:
+                await self._send(loading_msg.edit_text, loading_msg.chat_id, f"No {option_type.upper()} strikes for {ticker} {expiration}")
+                return
+
+            keyboard = []
+            for strike in np.sort(nearest['strike'].to_numpy()):
+                keyboard.append([
+                    InlineKeyboardButton(
+                        f"{option_type.upper()} ${strike:.2f}",
+                        callback_data=f"select|{ticker}|{option_type}|{strike}|{expiration}"
+                    )
+                ])
+
+            keyboard.append(self._cancel_trade_row)
+
+            reply_markup = InlineKeyboardMarkup(keyboard)
+
+            await self._send(
+                loading_msg.edit_text, loading_msg.chat_id,
+                f"*Select Strike for {ticker} {option_type.upper()}*\n"
+                f"Current Price: ${current_price:.2f}\n"
+                f"Expiration: {expiration}",
+                parse_mode='Markdown',
+                reply_markup=reply_markup
+            )
+
+        except Exception as e:
+            logger.exception("trade_command failed for %s", context.args)
+            await self._send(update.message.reply_text, update.effective_chat.id, f"Error loading strikes: {str(e)}")
+
+    async def analyze_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /analyze command with session chart and detailed option analysis"""
+        try:
+            if not context.args:
+                await self._send(
+                    update.message.reply_text, update.effective_chat.id,
+                    f"{self.emoji['warning']} Usage: `/analyze TICKER`\nExample: `/analyze SPY`",
+                    parse_mode='Markdown'
+                )
+                return
+
+            ticker = context.args[0].upper()
+
+            loading_msg = await self._send(
+                update.message.reply_text, update.effective_chat.id,
+                f"{self.emoji['chart']} Building detailed analysis for {ticker}..."
+            )
+
+            hist, expirations = await self._fetch_bundle(ticker)
+
+            if hist.empty:
+                await self._send(loading_msg.edit_text, loading_msg.chat_id, f"{self.emoji['cross']} No data found for {ticker}")
+                return
+
+            bars = Bars.from_df(hist)
+            current_price = float(bars.close[-1])
+
+            session_data = await asyncio.to_thread(self._session_ranges, bars, ticker)
+            direction, confidence, trade_type, reasoning = self.analyzer.determine_direction(
+                current_price, session_data, session_data['momentum']
+            )
+            options = self.analyzer.option_picker(
+                ticker, direction, current_price,
+                expirations[0] if expirations else self.get_next_friday()
+            )
+
+            # Charts only change when a new bar lands, so reuse a fresh render
+            key = (ticker, hist.index[-1].value)
+            chart = self.chart_cache.get(key)
+            if chart is None:
+                # Figure building and HTML serialization hold the GIL, render in a worker process
+                chart = await asyncio.get_running_loop().run_in_executor(
+                    self.chart_pool, _render_chart,
+                    hist[['Open', 'High', 'Low', 'Close']], session_data['sessions'], ticker
+                )
+                self.chart_cache[key] = chart
+
+            # Send straight from memory, nothing touches the filesystem
+            await self._send(
+                update.message.reply_document, update.effective_chat.id,
+                document=io.BytesIO(chart),
+                filename=f"{ticker}_analysis.html",
+                caption=f"{ticker} session ranges"
+            )
+
+            analysis = self.format_option_analysis(ticker, direction, confidence, options, reasoning)
+            await self._send(loading_msg.edit_text, loading_msg.chat_id, analysis, parse_mode='Markdown')
+
+        except Exception as e:
+            logger.exception("analyze_command failed for %s", context.args)
+            await self._send(update.message.reply_text, update.effective_chat.id, f"Error analyzing {ticker}: {str(e)}")
+
+    async def positions_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /positions command to show open positions with P&L"""
+        try:
+            loading_msg = await self._send(
+                update.message.reply_text, update.effective_chat.id,
+                f"{self.emoji['chart']} Fetching your positions..."
+            )
+
+            df = await asyncio.to_thread(self.tradier.get_positions_df)
+
+            if df.empty:
+                await self._send(loading_msg.edit_text, loading_msg.chat_id, f"{self.emoji['check']} No open positions")
+                return
+
+            # Tradier quotes many symbols per request; large books go out as concurrent batches
+            symbols = df['symbol'].tolist()
+            step = Config.TRADIER_QUOTE_BATCH
+            responses = await asyncio.gather(*(
+                asyncio.to_thread(self.tradier.get_quotes, symbols[i:i + step])
+                for i in range(0, len(symbols), step)
+            ))
+            last_prices = {}
+            for quotes in responses:
+                quote_rows = (quotes.get('quotes') or {}).get('quote', [])
+                if isinstance(quote_rows, dict):
+                    quote_rows = [quote_rows]
+                last_prices.update((q['symbol'], q.get('last') or 0) for q in quote_rows)
+
+            df['last_price'] = df['symbol'].map(last_prices).fillna(0).astype('f8')
+
+            # Fill symbols Tradier did not quote from one batched yfinance download
+            unquoted = df['last_price'] == 0
+            if unquoted.any():
+                fallback = await asyncio.to_thread(self._multi_hist, df.loc[unquoted, 'symbol'].tolist(), '1d')
+                closes = {t: h['Close'].iloc[-1] for t, h in fallback.items() if not h.empty}
+                df.loc[unquoted, 'last_price'] = df.loc[unquoted, 'symbol'].map(closes).fillna(0)
+
+            # Vectorized P&L over all positions; OCC option symbols carry a 100x multiplier
+            multiplier = np.where(df['symbol'].str.len() > 6, 100.0, 1.0)
+            df['value'] = df['last_price'] * df['quantity'] * multiplier
+            df['pnl'] = df['value'] - df['cost_basis']
+            total_pnl = df['pnl'].sum()
+
+            parts = [f"*OPEN POSITIONS* {self.emoji['money']}\n"]
+            parts.extend(
+                f"\n• *{row.symbol}* x{row.quantity:g}\n"
+                f"  Cost: ${row.cost_basis:.2f} | Value: ${row.value:.2f} | P&L: "
+                f"{self.emoji['up'] if row.pnl >= 0 else self.emoji['down']} ${row.pnl:+.2f}"
+                for row in df.itertuples(index=False)
+            )
+            parts.append(f"\n\n*Total P&L:* {self.emoji['fire'] if total_pnl > 0 else ''} ${total_pnl:+.2f}")
+            response = "".join(parts)
+
+            await self._send(loading_msg.edit_text, loading_msg.chat_id, response, parse_mode='Markdown')
+
+        except Exception as e:
+            logger.exception("positions_command failed")
+            await self._send(update.message.reply_text, update.effective_chat.id, f"Error fetching positions: {str(e)}")
+
     def get_option_expirations(self, ticker: str) -> List[str]:
+        """Get available option expiration dates, served from cache while fresh"""
+        return self._cached(self.exp_cache, ticker, lambda: self._fetch_option_expirations(ticker))
+    
+    def _fetch_option_expirations(self, ticker: str) -> List[str]:
         """Get available option expiration dates"""
+        # Listed expirations change at most daily, so a day-old copy on disk is still good
+        cached = self.file_cache.get('options', ticker, ttl=Config.EXPIRATIONS_DISK_TTL)
+        if cached:
+            return cached
+        
         try:
             # Get options from yfinance
-            stock = yf.Ticker(ticker)
+            stock = self._get_ticker(ticker)
             options = stock.options
             
             if not options:
-                # Generate standard expirations if none available
-                today = datetime.now()
-                expirations = []
-                for i in range(4):
-                    expiry = today + timedelta(days=7 * (i + 1))
-                    # Find Friday
-                    days_to_friday = (4 - expiry.weekday()) % 7
-                    if days_to_friday == 0:
-                        days_to_friday = 7
-                    expiry += timedelta(days=days_to_friday)
-                    expirations.append(expiry.strftime('%Y-%m-%d'))
-                return expirations
-            
-            return list(options)[:4]  # Return next 4 expirations
+                # Generate standard expirations if none available: the 2nd-5th Fridays out
+                return [str(d) for d in _fridays_after(eastern_now(), np.arange(1, 5))]
             
-        except Exception as e:
-            logger.error(f"Error getting expirations: {e}")
+            expirations = list(islice(options, 4))  # Return next 4 expirations
+            self.file_cache.put('options', ticker, value=expirations)
+            return expirations
+            
+        except Exception:
+            logger.exception("Error getting expirations for %s", ticker)
             return []
     
+    def get_next_option_expiration(self, ticker: str) -> str:
+        """Nearest listed expiration, or next Friday if none are listed"""
+        # Keyed by day so a cached expiry never outlives its date; day-old lists may still hold it
+        # Same Eastern clock as the analyzer's days-to-expiry, whatever the host's timezone
+        today = eastern_now().strftime('%Y-%m-%d')
+        expiry = self._cached(
+            self.next_exp_cache, (ticker, today),
+            lambda: next((e for e in self.get_option_expirations(ticker) if e >= today), '')
+        )
+        # Only listed expirations are cached; a failed lookup falls back afresh on every call
+        return expiry or self.get_next_friday()
+    
     def get_next_friday(self) -> str:
         """Get next Friday's date as string"""
-        today = datetime.now()
-        days_ahead = (4 - today.weekday()) % 7
-        if days_ahead == 0:
-            days_ahead = 7
-        next_friday = today + timedelta(days=days_ahead)
-        return next_friday.strftime('%Y-%m-%d')
+        return _next_friday_for(eastern_now().toordinal())
+    
+    async def shutdown(self, application):
+        """Stop the worker pools when the application stops"""
+        self.chart_pool.shutdown(wait=False, cancel_futures=True)
+        self.pool.shutdown(wait=False, cancel_futures=True)
     
     async def button_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle all button callbacks"""
         query = update.callback_query
         await query.answer()
         
-        data = query.data
+        action, _, rest = query.data.partition('|')
+        entry = self._cb_dispatch.get(action)
+        if entry is None:
+            return
         
-        if data.startswith('buy_'):
-            # Handle buy button
-            _, ticker, option_type = data.split('_')
-            await self.show_buy_options(query, ticker, option_type.upper())
-            
-        elif data.startswith('view_'):
-            _, ticker, option_type = data.split('_')
-            await self.show_option_details(query, ticker, option_type.upper())
-            
-        elif data.startswith('select_'):
-            _, ticker, option_type, strike, expiration = data.split('_')
-            await self.confirm_trade(query, ticker, option_type.upper(), float(strike), expiration)
-            
-        elif data.startswith('trade_'):
-            _, ticker, option_type, strike, expiration = data.split('_')
-            await self.place_trade(query, ticker, option_type.upper(), float(strike), expiration)
-            
-        elif data.startswith('pick_'):
-            _, ticker, direction = data.split('_')
-            await self.pick_command(update, context)
-            
-        elif data == 'close_chain':
-            await query.delete_message()
+        handler, n_args = entry
+        args = rest.split('|', n_args - 1) if rest else []
+        if len(args) != n_args:
+            logger.warning("Malformed callback data: %s", query.data)
+            return
+        
+        await handler(query, context, *args)
+    
+    async def _callback_price(self, context, ticker: str) -> float:
+        """Price /status showed this user, or a fresh quote once it is stale"""
+        stashed = context.user_data.get(f"price_{ticker}")
+        if stashed and time.monotonic() - stashed[1] < Config.CALLBACK_PRICE_TTL:
+            return stashed[0]
+        return await asyncio.to_thread(self._get_price, ticker)
     
-    async def show_buy_options(self, query, ticker, option_type):
+    async def show_analysis(self, query, context, ticker):
+        """Detailed analysis for a /status message, served from that run's results"""
+        analysis = self.analysis_cache.get((query.from_user.id, ticker))
+        if analysis is None:
+            await self._send(
+                query.message.reply_text, query.message.chat_id,
+                f"{self.emoji['clock']} Analysis expired, run `/analyze {ticker}` for a fresh one",
+                parse_mode='Markdown'
+            )
+            return
+        
+        text = self.format_option_analysis(ticker, *analysis)
+        await self._send(query.message.reply_text, query.message.chat_id, text, parse_mode='Markdown')
+    
+    async def show_chain(self, query, context, ticker):
+        """Option chain for the ticker a /status message is about"""
+        text, reply_markup = await self._chain_view(ticker, self._callback_price(context, ticker))
+        await self._send(query.message.reply_text, query.message.chat_id, text, parse_mode='Markdown', reply_markup=reply_markup)
+    
+    async def close_message(self, query, context, _target):
+        """Remove the message the button belongs to"""
+        await query.delete_message()
+    
+    async def show_option_details(self, query, context, ticker, side):
+        """Show the nearest strikes for one side of the chain"""
+        option_type = 'call' if side.startswith('call') else 'put'
+        expirations, current_price = await asyncio.gather(
+            asyncio.to_thread(self.get_option_expirations, ticker),
+            self._callback_price(context, ticker)
+        )
+        if not expirations:
+            await self._send(query.edit_message_text, query.message.chat_id, f"No options available for {ticker}")
+            return
+        
+        expiration = expirations[0]
+        chain_data = await asyncio.to_thread(
+            self.tradier.get_options_chain_near, ticker, expiration, current_price, option_types=(option_type,)
+        )
+        if not chain_data.get('options'):
+            await self._send(query.edit_message_text, query.message.chat_id, f"No option data for {ticker}")
+            return
+        
+        chain = _chain_frame(chain_data)
+        nearest = _with_quotes(_nearest_strikes(chain, current_price)[option_type]).to_dict('records')
+        
+        parts = [f"*{ticker} {option_type.upper()}S* {self.emoji['calendar']}\n"
+                 f"*Expiration:* {expiration}\n*Current Price:* ${current_price:.2f}\n"]
+        keyboard = []
+        for opt in nearest:
+            strike = opt['strike']
+            parts.append(f"\n• ${strike:.2f}: Bid ${opt['bid']:.2f} | Ask ${opt['ask']:.2f}")
+            keyboard.append([
+                InlineKeyboardButton(
+                    f"{option_type.upper()} ${strike:.2f}",
+                    callback_data=f"select|{ticker}|{option_type}|{strike}|{expiration}"
+                )
+            ])
+        keyboard.append(self._close_chain_row)
+        
+        await self._send(
+            query.edit_message_text, query.message.chat_id, "".join(parts),
+            parse_mode='Markdown', reply_markup=InlineKeyboardMarkup(keyboard)
+        )
+    
+    async def show_buy_options(self, query, context, ticker, option_type):
         """Show buy options interface"""
-        stock = yf.Ticker(ticker)
-        current_price = stock.info.get('regularMarketPrice', 0)
+        option_type = option_type.upper()
+        current_price = await self._callback_price(context, ticker)
         
         if option_type == 'CALL':
             strikes = [
@@ -501,25 +1258,25 @@ class EnhancedTradingBot:
             keyboard.append([
                 InlineKeyboardButton(
                     f"${strike} {option_type}",
-                    callback_data=f"select_{ticker}_{option_type.lower()}_{strike}_{self.get_next_friday()}"
+                    callback_data=f"select|{ticker}|{option_type.lower()}|{strike}|{self.get_next_friday()}"
                 )
             ])
         
-        keyboard.append([
-            InlineKeyboardButton(f"{self.emoji['cross']} Cancel", callback_data="cancel_buy")
-        ])
+        keyboard.append(self._cancel_buy_row)
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await query.edit_message_text(
+        await self._send(
+            query.edit_message_text, query.message.chat_id,
             f"*Select Strike Price for {ticker} {option_type}*\n"
             f"Current Price: ${current_price:.2f}",
             parse_mode='Markdown',
             reply_markup=reply_markup
         )
     
-    async def confirm_trade(self, query, ticker, option_type, strike, expiration):
+    async def confirm_trade(self, query, context, ticker, option_type, strike, expiration):
         """Show trade confirmation"""
+        option_type, strike = option_type.upper(), float(strike)
         response = f"""
 {self.emoji['money']} *TRADE CONFIRMATION*
 
@@ -541,21 +1298,22 @@ class EnhancedTradingBot:
         keyboard = [
             [
                 InlineKeyboardButton(f"{self.emoji['check']} Confirm Buy", 
-                                   callback_data=f"trade_{ticker}_{option_type.lower()}_{strike}_{expiration}"),
-                InlineKeyboardButton(f"{self.emoji['cross']} Cancel", 
-                                   callback_data="cancel_trade")
+                                   callback_data=f"trade|{ticker}|{option_type.lower()}|{strike}|{expiration}"),
+                self._cancel_trade_row[0]
             ]
         ]
         
         reply_markup = InlineKeyboardMarkup(keyboard)
         
-        await query.edit_message_text(response, parse_mode='Markdown', reply_markup=reply_markup)
+        await self._send(query.edit_message_text, query.message.chat_id, response, parse_mode='Markdown', reply_markup=reply_markup)
     
-    async def place_trade(self, query, ticker, option_type, strike, expiration):
+    async def place_trade(self, query, context, ticker, option_type, strike, expiration):
         """Place the actual trade"""
+        option_type, strike = option_type.upper(), float(strike)
         try:
             # Place order through Tradier
-            result = self.tradier.place_order(
+            result = await asyncio.to_thread(
+                self.tradier.place_order,
                 symbol=ticker,
                 quantity=1,
                 option_type=option_type.lower(),
@@ -565,7 +1323,8 @@ class EnhancedTradingBot:
             
             if 'order' in result:
                 order_id = result['order']['id']
-                await query.edit_message_text(
+                await self._send(
+                    query.edit_message_text, query.message.chat_id,
                     f"{self.emoji['check']} *ORDER EXECUTED!* {self.emoji['rocket']}\n\n"
                     f"*Symbol:* {ticker}\n"
                     f"*Type:* {option_type}\n"
@@ -581,7 +1340,8 @@ class EnhancedTradingBot:
                 )
             else:
                 error = result.get('errors', {}).get('error', 'Unknown error')
-                await query.edit_message_text(
+                await self._send(
+                    query.edit_message_text, query.message.chat_id,
                     f"{self.emoji['cross']} *ORDER FAILED*\n\n"
                     f"Error: {error}\n\n"
                     f"Please try again or contact support.",
@@ -589,8 +1349,9 @@ class EnhancedTradingBot:
                 )
                 
         except Exception as e:
-            logger.error(f"Trade error: {e}")
-            await query.edit_message_text(
+            logger.exception("Order failed for %s %s %s %s", ticker, option_type, strike, expiration)
+            await self._send(
+                query.edit_message_text, query.message.chat_id,
                 f"{self.emoji['cross']} *TRADE ERROR*\n\n"
                 f"An error occurred: {str(e)}\n"
                 f"Please try again later.",
@@ -600,8 +1361,17 @@ class EnhancedTradingBot:
 def main():
     """Start the enhanced bot"""
     bot = EnhancedTradingBot()
+    # Pay JIT compilation at startup rather than on the first /status
+    bot.analyzer._warmup()
     
-    application = Application.builder().token(Config.TELEGRAM_TOKEN).build()
+    # Without this PTB runs one update at a time, so a slow /status would stall every other chat
+    application = (
+        Application.builder()
+        .token(Config.TELEGRAM_TOKEN)
+        .concurrent_updates(Config.TELEGRAM_CONCURRENT_UPDATES)
+        .post_shutdown(bot.shutdown)
+        .build()
+    )
     
     # Add command handlers
     application.add_handler(CommandHandler("start", bot.start))
@@ -11,6 +11,11 @@ class Config:
     TRADIER_TOKEN = os.getenv('TRADIER_TOKEN')
     TRADIER_ACCOUNT_ID = os.getenv('TRADIER_ACCOUNT_ID')
     TRADIER_API_URL = "https://api.tradier.com/v1/"
+    # Symbols per quotes request; longer lists are split and fetched concurrently
+    TRADIER_QUOTE_BATCH = 50
+    # History cache lifetimes: ranges ending today vs. ranges that closed on an earlier day
+    TRADIER_HISTORY_LIVE_TTL = 300  # seconds
+    TRADIER_HISTORY_CLOSED_TTL = 43200  # 12 hours
     
     # Trading Parameters
     RISK_REWARD_RATIO = 2.0
@@ -25,6 +30,31 @@ class Config:
         'ny_end': 12        # 12 PM EST
     }
     
+    # Cold history requests arriving within this window share one download
+    HISTORY_BATCH_WINDOW = 0.05  # seconds
+    
+    # Telegram send pacing (Telegram allows ~30 msg/s globally, ~1 msg/s per chat)
+    TELEGRAM_MAX_CONCURRENT_SENDS = 25
+    TELEGRAM_CHAT_INTERVAL = 1.0
+    # Updates handled at once; handlers mostly await worker threads and the network
+    TELEGRAM_CONCURRENT_UPDATES = 64
+    
+    # On-disk market data cache, lets a restarted bot start warm
+    CACHE_DIR = os.getenv('CACHE_DIR', '.cache/yf')
+    HISTORY_DISK_TTL = 900  # 15 minutes, intraday bars
+    EXPIRATIONS_DISK_TTL = 86400  # 24 hours
+    
+    # Bars older than this no longer stand in for a live quote
+    PRICE_STALE_AFTER = 900  # seconds
+    
+    # How long a price shown by /status is reused by its buttons
+    CALLBACK_PRICE_TTL = 60  # seconds
+    # How long /status results back its Detailed Analysis button
+    ANALYSIS_CACHE_TTL = 120  # seconds
+    
+    # Chart rendering
+    CHART_CACHE_TTL = 900  # 15 minutes
+    
     # Emojis
     EMOJI = {
         'bull': '🐂',
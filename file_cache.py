@@ -0,0 +1,75 @@
+import hashlib
+import logging
+import os
+import re
+import time
+
+import orjson
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Characters allowed in a ticker's cache directory name
+_UNSAFE_PATH_CHARS = re.compile(r'[^A-Za-z0-9.^=-]')
+
+class FileCache:
+    """Disk cache for market data so a restarted bot starts warm"""
+    
+    def __init__(self, root: str):
+        self.root = root
+    
+    def _paths(self, endpoint: str, ticker: str, args: tuple):
+        """Data and sidecar paths for one cache entry"""
+        digest = hashlib.md5(f"{endpoint}|{ticker}|{args}".encode()).hexdigest()[:16]
+        # Tickers are user input: no separators, and no leading dots that could spell '..'
+        # The digest still hashes the raw ticker, so names that sanitize alike stay apart
+        directory = _UNSAFE_PATH_CHARS.sub('_', ticker).lstrip('.') or '_'
+        base = os.path.join(self.root, directory, f"{endpoint}_{digest}")
+        return base + '.parquet', base + '.json', base + '.meta.json'
+    
+    def _fetched_at(self, meta_path: str) -> float:
+        try:
+            with open(meta_path, 'rb') as f:
+                return orjson.loads(f.read())['fetched_at']
+        except (OSError, ValueError, KeyError):
+            return 0.0
+    
+    def fresh(self, endpoint: str, ticker: str, *args, ttl: float) -> bool:
+        """True if an entry exists and was fetched within ttl seconds"""
+        meta_path = self._paths(endpoint, ticker, args)[2]
+        return time.time() - self._fetched_at(meta_path) < ttl
+    
+    def get(self, endpoint: str, ticker: str, *args, ttl: float):
+        """Cached value if fetched within ttl seconds, else None"""
+        parquet_path, json_path, meta_path = self._paths(endpoint, ticker, args)
+        if time.time() - self._fetched_at(meta_path) >= ttl:
+            return None
+        
+        try:
+            if os.path.exists(parquet_path):
+                return pd.read_parquet(parquet_path)
+            with open(json_path, 'rb') as f:
+                return orjson.loads(f.read())
+        except Exception as e:
+            logger.warning("Unreadable cache entry %s/%s: %s", ticker, endpoint, e)
+            return None
+    
+    def put(self, endpoint: str, ticker: str, *args, value):
+        """Store value (DataFrame as parquet, anything else as JSON) with its fetch time"""
+        parquet_path, json_path, meta_path = self._paths(endpoint, ticker, args)
+        try:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial entry
+            if isinstance(value, pd.DataFrame):
+                value.to_parquet(parquet_path + '.tmp')
+                os.replace(parquet_path + '.tmp', parquet_path)
+            else:
+                with open(json_path + '.tmp', 'wb') as f:
+                    f.write(orjson.dumps(value))
+                os.replace(json_path + '.tmp', json_path)
+            with open(meta_path + '.tmp', 'wb') as f:
+                f.write(orjson.dumps({'fetched_at': time.time()}))
+            os.replace(meta_path + '.tmp', meta_path)
+        except Exception as e:
+            # A failed cache write only costs a refetch later
+            logger.warning("Could not cache %s/%s: %s", ticker, endpoint, e)
@@ -1,86 +1,201 @@
+import threading
+
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, timedelta
+from itertools import compress
 import pytz
 from typing import Dict, List, Tuple
 import talib
+from cachetools import LRUCache
+
+from indicators_numba import NUMBA_AVAILABLE, score_strikes, wilder_atr, wilder_atr_numpy
+
+# Without Numba the kernel is a Python loop, the buffered NumPy version is faster
+_atr_impl = wilder_atr if NUMBA_AVAILABLE else wilder_atr_numpy
+
+# Built once: pytz.timezone reads the zoneinfo file on every call
+_EST = pytz.timezone('US/Eastern')
+_UTC = pytz.utc
+
+# Bars fed to the recursive indicators (RSI, MACD); their weight on older bars has
+# decayed below 1e-7 by then, so the last value matches a full-history run
+_EMA_TAIL = 250
+
+# determine_direction weights: session position, RSI, MACD, trend, volume
+_FACTOR_WEIGHTS = np.array([0.40, 0.20, 0.15, 0.15, 0.10])
+
+# Session ids used by calculate_session_ranges, in id order
+_SESSION_NAMES = ('asian', 'london', 'ny')
+
+
+@dataclass(frozen=True)
+class Bars:
+    """OHLCV columns of a price history as plain ndarrays"""
+    close: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    volume: np.ndarray
+    index: pd.DatetimeIndex
+    
+    @classmethod
+    def from_df(cls, df: pd.DataFrame) -> 'Bars':
+        """Extract the columns once; float64 columns are viewed, not copied"""
+        return cls(
+            close=df['Close'].to_numpy(dtype=np.float64),
+            high=df['High'].to_numpy(dtype=np.float64),
+            low=df['Low'].to_numpy(dtype=np.float64),
+            volume=df['Volume'].to_numpy(dtype=np.float64),
+            index=df.index
+        )
+    
+    def __len__(self):
+        return len(self.close)
+
+
+class Opt:
+    """One option candidate from option_picker; slots keep field access off the dict path"""
+    __slots__ = ('type', 'strike', 'delta', 'theta', 'risk_level', 'description', 'premium_estimate')
+    
+    def __init__(self, type: str, strike: float, delta: float, theta: float,
+                 risk_level: str, description: str, premium_estimate: float):
+        self.type = type
+        self.strike = strike
+        self.delta = delta
+        self.theta = theta
+        self.risk_level = risk_level
+        self.description = description
+        self.premium_estimate = premium_estimate
+
+
+def eastern_now() -> datetime:
+    """Current US/Eastern time; option expirations are Eastern calendar dates"""
+    return datetime.now(_EST)
+
+
+@lru_cache(maxsize=256)
+def _days_to_expiry_cached(expiration: str, today_ordinal: int) -> int:
+    """Whole days left until an expiration, keyed by day so the cache rolls over at midnight"""
+    expiry_ordinal = datetime.strptime(expiration, '%Y-%m-%d').toordinal()
+    # Time has passed since midnight, so today never counts as a full day
+    return max(expiry_ordinal - today_ordinal - 1, 1)
+
+
+def atr_last(bars: Bars, n: int = 14) -> float:
+    """Wilder ATR (EWM with alpha=1/n) at the last bar"""
+    return _atr_impl(bars.high, bars.low, bars.close, n)
 
 class EnhancedSessionRangeAnalyzer:
+    est = _EST
+    utc = _UTC
+    
+    # Which side of the price take-profit sits on for each direction
+    _DIRECTION_SIGN = {'CALL': 1, 'BULLISH': 1, 'PUT': -1, 'BEARISH': -1}
+    
     def __init__(self):
-        self.est = pytz.timezone('US/Eastern')
-        self.utc = pytz.utc
+        # ticker -> (UTC ns stamps, EST hours) of the last window analyzed; tickers are user input
+        self._hour_cache = LRUCache(maxsize=256)
+        # Analyses run in worker threads and LRUCache reorders on every read
+        self._hour_lock = threading.Lock()
+    
+    def _warmup(self):
+        """Compile the Numba kernels and prime the analysis path before the first request"""
+        # 60 flat 15m bars are enough for every indicator period used below
+        index = pd.date_range('2024-01-02', periods=60, freq='15min', tz='UTC')
+        flat = np.full(60, 100.0)
+        bars = Bars(close=flat, high=flat + 1.0, low=flat - 1.0, volume=flat, index=index)
+        # cache=True persists the compiled ATR kernel, so later starts only load it
+        atr_last(bars, 14)
+        score_strikes(100.0, flat[:3], 7, 50.0, True)
+        self.calculate_session_ranges(bars, 'WARMUP')
+    
+    @staticmethod
+    def _session_stats(bars: Bars, sid: np.ndarray) -> Dict[str, Dict]:
+        """High/low/range/mid/volume of every session present, in one grouped pass"""
+        # A stable sort of small ints is a radix sort; it lays each session out as one run
+        order = np.argsort(sid, kind='stable')
+        ranked = sid[order]
+        ids = np.arange(len(_SESSION_NAMES))
+        starts = np.searchsorted(ranked, ids)
+        counts = np.searchsorted(ranked, ids, side='right') - starts
+        present = counts > 0
+        if not present.any():
+            return {}
         
-    def calculate_session_ranges(self, df, ticker):
+        # Runs are contiguous and ordered, so each reduceat segment is exactly one session
+        starts = starts[present]
+        highs = np.maximum.reduceat(bars.high[order], starts)
+        lows = np.minimum.reduceat(bars.low[order], starts)
+        volumes = np.add.reduceat(bars.volume[order], starts) / counts[present]
+        # Plain floats: cheaper to compare and format downstream, and lighter to pickle for the chart worker
+        return {
+            name: {'high': high, 'low': low, 'range': high - low, 'mid': (high + low) / 2, 'volume': volume}
+            for name, high, low, volume in zip(
+                compress(_SESSION_NAMES, present), highs.tolist(), lows.tolist(), volumes.tolist()
+            )
+        }
+        
+    def _est_hours(self, ticker: str, index: pd.DatetimeIndex) -> np.ndarray:
+        """EST hour of each bar, converting only bars not seen in this ticker's last window"""
+        stamps = index.asi8
+        with self._hour_lock:
+            cached = self._hour_cache.get(ticker)
+        hours = None
+        if cached is not None and len(stamps):
+            # History windows slide forward: the new one starts inside the old one
+            old_stamps, old_hours = cached
+            start = np.searchsorted(old_stamps, stamps[0])
+            overlap = len(old_stamps) - start
+            if 0 < overlap <= len(stamps) and np.array_equal(old_stamps[start:], stamps[:overlap]):
+                hours = np.concatenate([old_hours[start:], index[overlap:].tz_convert(_EST).hour.to_numpy()])
+        if hours is None:
+            hours = index.tz_convert(_EST).hour.to_numpy()
+        with self._hour_lock:
+            self._hour_cache[ticker] = (stamps, hours)
+        return hours
+    
+    def calculate_session_ranges(self, bars: Bars, ticker):
         """
         Calculate Asian, London, and NY session ranges with enhanced analysis
         """
-        # Convert DataFrame to EST
-        df_est = df.tz_convert(self.est)
-        df_est['hour'] = df_est.index.hour
-        df_est['minute'] = df_est.index.minute
+        if isinstance(bars, pd.DataFrame):
+            bars = Bars.from_df(bars)
+        
+        # Session hours in EST
+        hour = self._est_hours(ticker, bars.index)
         
         results = {
             'ticker': ticker,
-            'timestamp': datetime.now(self.est),
-            'current_price': df_est['Close'].iloc[-1],
-            'volume': df_est['Volume'].iloc[-1],
+            'timestamp': datetime.now(_EST),
+            'current_price': bars.close[-1],
+            'volume': bars.volume[-1],
             'sessions': {},
             'momentum': {}
         }
         
-        # Calculate technical indicators
-        df_est['RSI'] = talib.RSI(df_est['Close'], timeperiod=14)
-        df_est['SMA20'] = talib.SMA(df_est['Close'], timeperiod=20)
-        df_est['SMA50'] = talib.SMA(df_est['Close'], timeperiod=50)
-        df_est['MACD'], df_est['MACD_signal'], df_est['MACD_hist'] = talib.MACD(
-            df_est['Close'], fastperiod=12, slowperiod=26, signalperiod=9
-        )
-        
-        # Asian Session (8 PM - 2 AM EST)
-        asian_mask = (df_est['hour'] >= 20) | (df_est['hour'] < 2)
-        if any(asian_mask):
-            asian_df = df_est[asian_mask]
-            results['sessions']['asian'] = {
-                'high': asian_df['High'].max(),
-                'low': asian_df['Low'].min(),
-                'range': asian_df['High'].max() - asian_df['Low'].min(),
-                'mid': (asian_df['High'].max() + asian_df['Low'].min()) / 2,
-                'volume': asian_df['Volume'].mean()
-            }
-        
-        # London Session (3 AM - 7 AM EST)
-        london_mask = (df_est['hour'] >= 3) & (df_est['hour'] < 7)
-        if any(london_mask):
-            london_df = df_est[london_mask]
-            results['sessions']['london'] = {
-                'high': london_df['High'].max(),
-                'low': london_df['Low'].min(),
-                'range': london_df['High'].max() - london_df['Low'].min(),
-                'mid': (london_df['High'].max() + london_df['Low'].min()) / 2,
-                'volume': london_df['Volume'].mean()
-            }
+        # Only the last value of each indicator is used, so run them on tails, not the full history
+        close = bars.close
+        tail = close[-_EMA_TAIL:]
+        rsi = talib.RSI(tail, timeperiod=14)[-1]
+        macd_hist = talib.MACD(tail, fastperiod=12, slowperiod=26, signalperiod=9)[2][-1]
+        sma20 = talib.SMA(close[-20:], timeperiod=20)[-1]
+        sma50 = talib.SMA(close[-50:], timeperiod=50)[-1]
         
-        # NY Session (8 AM - 12 PM EST)
-        ny_mask = (df_est['hour'] >= 8) & (df_est['hour'] < 12)
-        if any(ny_mask):
-            ny_df = df_est[ny_mask]
-            results['sessions']['ny'] = {
-                'high': ny_df['High'].max(),
-                'low': ny_df['Low'].min(),
-                'range': ny_df['High'].max() - ny_df['Low'].min(),
-                'mid': (ny_df['High'].max() + ny_df['Low'].min()) / 2,
-                'volume': ny_df['Volume'].mean()
-            }
+        # Session id per bar: Asian 8 PM - 2 AM, London 3 - 7 AM, NY 8 AM - 12 PM EST, -1 otherwise
+        sid = np.select(
+            [(hour >= 20) | (hour < 2), (hour >= 3) & (hour < 7), (hour >= 8) & (hour < 12)],
+            [0, 1, 2], default=-1
+        ).astype(np.int8)
+        results['sessions'] = self._session_stats(bars, sid)
         
         # Momentum analysis
-        current_rsi = df_est['RSI'].iloc[-1]
-        macd_hist = df_est['MACD_hist'].iloc[-1]
-        
         results['momentum'] = {
-            'rsi': current_rsi,
+            'rsi': rsi,
             'macd_hist': macd_hist,
-            'trend': 'BULLISH' if df_est['SMA20'].iloc[-1] > df_est['SMA50'].iloc[-1] else 'BEARISH',
-            'price_vs_sma20': (df_est['Close'].iloc[-1] - df_est['SMA20'].iloc[-1]) / df_est['SMA20'].iloc[-1] * 100
+            'trend': 'BULLISH' if sma20 > sma50 else 'BEARISH',
+            'price_vs_sma20': (close[-1] - sma20) / sma20 * 100
         }
         
         return results
@@ -89,7 +204,9 @@ class EnhancedSessionRangeAnalyzer:
         """
         Determine CALL/PUT direction with confidence score and reasoning
         """
-        confidence_factors = []
+        # Up to five factors; ones without data are skipped, so n counts the filled slots
+        factors = np.empty(len(_FACTOR_WEIGHTS))
+        n = 0
         reasoning = []
         
         # Factor 1: Price vs Session Ranges (40% weight)
@@ -99,48 +216,60 @@ class EnhancedSessionRangeAnalyzer:
             asian_mid = session_data['sessions']['asian']['mid']
             
             if current_price > asian_high:
-                confidence_factors.append(80)  # Bullish breakout
+                factors[n] = 80  # Bullish breakout
+                n += 1
                 reasoning.append(f"Price above Asian high (${asian_high:.2f})")
             elif current_price > asian_mid:
-                confidence_factors.append(60)  # Bullish within range
+                factors[n] = 60  # Bullish within range
+                n += 1
                 reasoning.append(f"Price in upper Asian range")
             elif current_price < asian_low:
-                confidence_factors.append(20)  # Bearish breakout
+                factors[n] = 20  # Bearish breakout
+                n += 1
                 reasoning.append(f"Price below Asian low (${asian_low:.2f})")
             elif current_price < asian_mid:
-                confidence_factors.append(40)  # Bearish within range
+                factors[n] = 40  # Bearish within range
+                n += 1
                 reasoning.append(f"Price in lower Asian range")
         
         # Factor 2: RSI Analysis (20% weight)
         rsi = momentum['rsi']
         if rsi > 70:
-            confidence_factors.append(30)  # Overbought, potential reversal
+            factors[n] = 30  # Overbought, potential reversal
+            n += 1
             reasoning.append(f"RSI overbought ({rsi:.1f})")
         elif rsi > 50:
-            confidence_factors.append(60)  # Bullish momentum
+            factors[n] = 60  # Bullish momentum
+            n += 1
             reasoning.append(f"RSI bullish ({rsi:.1f})")
         elif rsi > 30:
-            confidence_factors.append(40)  # Bearish momentum
+            factors[n] = 40  # Bearish momentum
+            n += 1
             reasoning.append(f"RSI bearish ({rsi:.1f})")
         else:
-            confidence_factors.append(70)  # Oversold, potential reversal
+            factors[n] = 70  # Oversold, potential reversal
+            n += 1
             reasoning.append(f"RSI oversold ({rsi:.1f})")
         
         # Factor 3: MACD (15% weight)
         macd_hist = momentum['macd_hist']
         if macd_hist > 0:
-            confidence_factors.append(65)  # Bullish MACD
+            factors[n] = 65  # Bullish MACD
+            n += 1
             reasoning.append(f"MACD bullish ({macd_hist:.3f})")
         else:
-            confidence_factors.append(35)  # Bearish MACD
+            factors[n] = 35  # Bearish MACD
+            n += 1
             reasoning.append(f"MACD bearish ({macd_hist:.3f})")
         
         # Factor 4: Trend (15% weight)
         if momentum['trend'] == 'BULLISH':
-            confidence_factors.append(70)
+            factors[n] = 70
+            n += 1
             reasoning.append("Uptrend (SMA20 > SMA50)")
         else:
-            confidence_factors.append(30)
+            factors[n] = 30
+            n += 1
             reasoning.append("Downtrend (SMA20 < SMA50)")
         
         # Factor 5: Volume analysis (10% weight)
@@ -150,22 +279,23 @@ class EnhancedSessionRangeAnalyzer:
             volume_ratio = current_volume / asian_volume if asian_volume > 0 else 1
             
             if volume_ratio > 1.5:
-                confidence_factors.append(70)
+                factors[n] = 70
+                n += 1
                 reasoning.append(f"High volume ({volume_ratio:.1f}x avg)")
             elif volume_ratio > 1.0:
-                confidence_factors.append(55)
+                factors[n] = 55
+                n += 1
                 reasoning.append(f"Average volume")
             else:
-                confidence_factors.append(40)
+                factors[n] = 40
+                n += 1
                 reasoning.append(f"Low volume ({volume_ratio:.1f}x avg)")
         
-        # Calculate weighted average confidence
-        weights = [0.40, 0.20, 0.15, 0.15, 0.10]
-        weighted_confidences = [cf * w for cf, w in zip(confidence_factors, weights)]
-        confidence = sum(weighted_confidences)
+        # Calculate weighted average confidence; weights apply in the order factors were filled
+        confidence = float(factors[:n] @ _FACTOR_WEIGHTS[:n])
         
         # Determine direction
-        avg_confidence = np.mean(confidence_factors)
+        avg_confidence = factors[:n].mean()
         if avg_confidence > 55:
             direction = "CALL"
             trade_type = "BULLISH"
@@ -179,135 +309,72 @@ class EnhancedSessionRangeAnalyzer:
         return direction, min(confidence, 100), trade_type, reasoning
     
     def option_picker(self, ticker: str, direction: str, current_price: float, 
-                     expiration_date: str, iv_rank: float = 50) -> List[Dict]:
+                     expiration_date: str, iv_rank: float = 50) -> List['Opt']:
         """
         Pick optimal options based on direction analysis
         """
-        options = []
+        if direction not in ("CALL", "PUT"):
+            return []
+        is_call = direction == "CALL"
         
-        if direction == "CALL":
-            # For calls, choose strikes above current price
-            strikes = [
-                current_price * 1.01,  # 1% OTM
-                current_price * 1.02,  # 2% OTM
-                current_price * 1.05,  # 5% OTM (higher risk/reward)
-            ]
-            
-            for strike in strikes:
-                strike = round(strike, 2)
-                delta = self.calculate_option_delta(current_price, strike, expiration_date, 
-                                                   is_call=True, iv_rank=iv_rank)
-                theta = self.calculate_option_theta(current_price, strike, expiration_date,
-                                                   is_call=True, iv_rank=iv_rank)
-                
-                options.append({
-                    'type': 'CALL',
-                    'strike': strike,
-                    'delta': delta,
-                    'theta': theta,
-                    'risk_level': 'MODERATE' if strike <= current_price * 1.02 else 'AGGRESSIVE',
-                    'description': f"{'ITM' if strike < current_price else 'OTM'} Call",
-                    'premium_estimate': self.estimate_premium(current_price, strike, 
-                                                             expiration_date, is_call=True)
-                })
-                
-        elif direction == "PUT":
-            # For puts, choose strikes below current price
-            strikes = [
-                current_price * 0.99,  # 1% OTM
-                current_price * 0.98,  # 2% OTM
-                current_price * 0.95,  # 5% OTM (higher risk/reward)
-            ]
+        # 1% and 2% OTM, plus 5% OTM for higher risk/reward; calls above the price, puts below
+        steps = (1.01, 1.02, 1.05) if is_call else (0.99, 0.98, 0.95)
+        strikes = np.array([round(current_price * step, 2) for step in steps])
+        deltas, thetas, premiums = score_strikes(
+            current_price, strikes, self._days_to_expiry(expiration_date), float(iv_rank), is_call
+        )
+        
+        options = []
+        for strike, delta, theta, premium in zip(strikes.tolist(), deltas.tolist(),
+                                                 thetas.tolist(), premiums.tolist()):
+            if is_call:
+                risk_level = 'MODERATE' if strike <= current_price * 1.02 else 'AGGRESSIVE'
+                description = f"{'ITM' if strike < current_price else 'OTM'} Call"
+            else:
+                risk_level = 'MODERATE' if strike >= current_price * 0.98 else 'AGGRESSIVE'
+                description = f"{'ITM' if strike > current_price else 'OTM'} Put"
             
-            for strike in strikes:
-                strike = round(strike, 2)
-                delta = self.calculate_option_delta(current_price, strike, expiration_date,
-                                                   is_call=False, iv_rank=iv_rank)
-                theta = self.calculate_option_theta(current_price, strike, expiration_date,
-                                                   is_call=False, iv_rank=iv_rank)
-                
-                options.append({
-                    'type': 'PUT',
-                    'strike': strike,
-                    'delta': delta,
-                    'theta': theta,
-                    'risk_level': 'MODERATE' if strike >= current_price * 0.98 else 'AGGRESSIVE',
-                    'description': f"{'ITM' if strike > current_price else 'OTM'} Put",
-                    'premium_estimate': self.estimate_premium(current_price, strike,
-                                                             expiration_date, is_call=False)
-                })
+            options.append(Opt(
+                type=direction,
+                strike=strike,
+                delta=round(delta, 2),
+                theta=round(theta, 3),
+                risk_level=risk_level,
+                description=description,
+                premium_estimate=round(premium, 2)
+            ))
         
         # Sort by risk/reward ratio
-        options.sort(key=lambda x: abs(x['delta']), reverse=True)
+        options.sort(key=lambda x: abs(x.delta), reverse=True)
         return options[:3]  # Return top 3 options
     
+    def _score_strike(self, spot: float, strike: float, expiration: str,
+                      is_call: bool, iv_rank: float = 50) -> Tuple[float, float, float]:
+        """Delta, theta and premium of a single strike via the shared kernel"""
+        deltas, thetas, premiums = score_strikes(
+            spot, np.array([strike], dtype=np.float64), self._days_to_expiry(expiration), float(iv_rank), is_call
+        )
+        return float(deltas[0]), float(thetas[0]), float(premiums[0])
+    
     def calculate_option_delta(self, spot: float, strike: float, expiration: str, 
                              is_call: bool, iv_rank: float) -> float:
         """Calculate approximate option delta"""
-        time_to_expiry = self._days_to_expiry(expiration)
-        moneyness = spot / strike
-        
-        if is_call:
-            # Simplified delta calculation for calls
-            if moneyness > 1.05:  # Deep ITM
-                delta = 0.85
-            elif moneyness > 1.02:  # Slightly ITM
-                delta = 0.65
-            elif moneyness > 0.98:  # Near ATM
-                delta = 0.50
-            elif moneyness > 0.95:  # Slightly OTM
-                delta = 0.35
-            else:  # Deep OTM
-                delta = 0.20
-        else:
-            # Simplified delta calculation for puts
-            if moneyness < 0.95:  # Deep ITM
-                delta = -0.85
-            elif moneyness < 0.98:  # Slightly ITM
-                delta = -0.65
-            elif moneyness < 1.02:  # Near ATM
-                delta = -0.50
-            elif moneyness < 1.05:  # Slightly OTM
-                delta = -0.35
-            else:  # Deep OTM
-                delta = -0.20
-        
-        # Adjust for IV
-        delta *= (1 + (iv_rank - 50) / 200)
-        return round(delta, 2)
+        return round(self._score_strike(spot, strike, expiration, is_call, iv_rank)[0], 2)
     
     def calculate_option_theta(self, spot: float, strike: float, expiration: str,
                              is_call: bool, iv_rank: float) -> float:
         """Calculate approximate option theta (daily time decay)"""
-        time_to_expiry = self._days_to_expiry(expiration)
-        
-        # Base theta based on time to expiry
-        if time_to_expiry < 7:
-            theta = -0.05  # High decay for weekly options
-        elif time_to_expiry < 14:
-            theta = -0.03  # Moderate decay
-        else:
-            theta = -0.02  # Lower decay for monthly options
-        
-        # Adjust for IV
-        theta *= (1 + (iv_rank - 50) / 100)
-        return round(theta, 3)
+        return round(self._score_strike(spot, strike, expiration, is_call, iv_rank)[1], 3)
     
     def estimate_premium(self, spot: float, strike: float, expiration: str,
                         is_call: bool) -> float:
         """Estimate option premium"""
-        time_to_expiry = self._days_to_expiry(expiration)
-        intrinsic = max(spot - strike, 0) if is_call else max(strike - spot, 0)
-        
-        # Simplified extrinsic value estimation
-        extrinsic = spot * 0.02 * (time_to_expiry / 30) ** 0.5
-        
-        return round(intrinsic + extrinsic, 2)
+        return round(self._score_strike(spot, strike, expiration, is_call)[2], 2)
     
     def _days_to_expiry(self, expiration: str) -> int:
         """Calculate days to expiration"""
-        expiry_date = datetime.strptime(expiration, '%Y-%m-%d')
-        return max((expiry_date - datetime.now()).days, 1)
+        # Expirations are US/Eastern dates, so count from the Eastern calendar day, not the host's
+        return _days_to_expiry_cached(expiration, eastern_now().toordinal())
     
     def calculate_tp_sl(self, current_price: float, direction: str, 
                        atr: float, confidence: float, option_type: str = None) -> Dict:
@@ -315,32 +382,20 @@ class EnhancedSessionRangeAnalyzer:
         Calculate Take Profit and Stop Loss with option-specific adjustments
         """
         risk_multiplier = confidence / 100
+        sign = self._DIRECTION_SIGN.get(direction, 0)
         
-        if direction == "CALL" or direction == "BULLISH":
-            # For calls/long positions
-            stop_loss_pct = 0.03 - (0.01 * risk_multiplier)
-            take_profit_pct = 0.06 + (0.02 * risk_multiplier)
-            
-            if option_type == "CALL":
-                # More aggressive SL for options due to theta decay
-                stop_loss_pct *= 1.5
-                take_profit_pct *= 1.2
-            
-            stop_loss = current_price * (1 - stop_loss_pct)
-            take_profit = current_price * (1 + take_profit_pct)
-            
-        elif direction == "PUT" or direction == "BEARISH":
-            # For puts/short positions
+        if sign:
+            # Same distances either way; calls/long positions sit above, puts/short below
             stop_loss_pct = 0.03 - (0.01 * risk_multiplier)
             take_profit_pct = 0.06 + (0.02 * risk_multiplier)
             
-            if option_type == "PUT":
+            if option_type == ("CALL" if sign > 0 else "PUT"):
                 # More aggressive SL for options due to theta decay
                 stop_loss_pct *= 1.5
                 take_profit_pct *= 1.2
             
-            stop_loss = current_price * (1 + stop_loss_pct)
-            take_profit = current_price * (1 - take_profit_pct)
+            stop_loss = current_price * (1 - sign * stop_loss_pct)
+            take_profit = current_price * (1 + sign * take_profit_pct)
         
         else:
             # Neutral/default
@@ -351,8 +406,10 @@ class EnhancedSessionRangeAnalyzer:
         stop_loss = round(max(stop_loss, 0.01), 2)
         take_profit = round(take_profit, 2)
         
+        # Rounding can pull the stop onto the price for very cheap underlyings
+        risk = current_price - stop_loss
         return {
             'stop_loss': stop_loss,
             'take_profit': take_profit,
-            'risk_reward': abs((take_profit - current_price) / (current_price - stop_loss))
+            'risk_reward': abs((take_profit - current_price) / risk) if risk else 0.0
         }
@@ -0,0 +1,89 @@
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Numba is optional; fall back to plain Python kernels
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# nogil: /status runs this from a worker thread, so it need not block the event loop
+@njit(cache=True, fastmath=True, nogil=True)
+def wilder_atr(high, low, close, period):
+    """Wilder's Average True Range at the last bar"""
+    n = len(close)
+    if n < 2:
+        return np.nan
+    alpha = 1.0 / period
+    atr = 0.0
+    for i in range(1, n):
+        prev_close = close[i - 1]
+        tr = max(high[i] - low[i], abs(high[i] - prev_close), abs(low[i] - prev_close))
+        if i == 1:
+            atr = tr
+        else:
+            atr += alpha * (tr - atr)
+    return atr
+
+
+def true_range(high, low, close):
+    """True range for bars 1..n-1, computed in one preallocated (3, n-1) buffer"""
+    m = len(close) - 1
+    buf = np.empty((3, m), dtype=np.float64)
+    prev_close = close[:-1]
+    np.subtract(high[1:], low[1:], out=buf[0])
+    np.subtract(high[1:], prev_close, out=buf[1])
+    np.abs(buf[1], out=buf[1])
+    np.subtract(low[1:], prev_close, out=buf[2])
+    np.abs(buf[2], out=buf[2])
+    return buf.max(axis=0)
+
+
+def wilder_atr_numpy(high, low, close, period):
+    """Vectorized wilder_atr for when Numba is unavailable"""
+    if len(close) < 2:
+        return np.nan
+    tr = true_range(high, low, close)
+    # Unrolled recursion: the first TR seeds the average, later ones decay by (1 - alpha)
+    alpha = 1.0 / period
+    weights = alpha * (1.0 - alpha) ** np.arange(len(tr) - 1, -1, -1, dtype=np.float64)
+    weights[0] = (1.0 - alpha) ** (len(tr) - 1)
+    return float(weights @ tr)
+
+
+# Moneyness thresholds between the delta buckets, and each bucket's delta
+_MONEYNESS_STEPS = np.array([0.95, 0.98, 1.02, 1.05])
+_CALL_DELTA = np.array([0.20, 0.35, 0.50, 0.65, 0.85])  # Deep OTM .. deep ITM
+_PUT_DELTA = np.array([-0.85, -0.65, -0.50, -0.35, -0.20])  # Deep ITM .. deep OTM
+
+
+@njit(cache=True)
+def score_strikes(spot, strikes, days, iv_rank, is_call):
+    """Approximate delta, daily theta and premium for each strike of one expiration"""
+    # Theta and extrinsic value depend only on time to expiry, not on the strike
+    if days < 7:
+        base_theta = -0.05  # High decay for weekly options
+    elif days < 14:
+        base_theta = -0.03  # Moderate decay
+    else:
+        base_theta = -0.02  # Lower decay for monthly options
+    base_theta *= 1 + (iv_rank - 50) / 100
+    extrinsic = spot * 0.02 * (days / 30) ** 0.5
+    iv_adjust = 1 + (iv_rank - 50) / 200
+    
+    # Bucket lookup instead of an if/elif ladder; a moneyness exactly on a
+    # threshold falls in the less-in-the-money bucket, as the ladder did
+    moneyness = spot / strikes
+    if is_call:
+        delta = _CALL_DELTA[np.searchsorted(_MONEYNESS_STEPS, moneyness, side='left')]
+        intrinsic = np.maximum(spot - strikes, 0.0)
+    else:
+        delta = _PUT_DELTA[np.searchsorted(_MONEYNESS_STEPS, moneyness, side='right')]
+        intrinsic = np.maximum(strikes - spot, 0.0)
+    return delta * iv_adjust, np.full(len(strikes), base_theta), intrinsic + extrinsic
@@ -1,25 +1,66 @@
+import heapq
+import threading
+from functools import lru_cache
+
 import requests
-import json
+import orjson
+import pandas as pd
+from cachetools import TTLCache
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import Config
+from file_cache import FileCache
+
+@lru_cache(maxsize=1024)
+def _build_occ_symbol(symbol: str, expiration: str, strike: float, is_call: bool) -> str:
+    """OCC option symbol, e.g. SPY 2024-01-19 470 call -> SPY240119C00470000"""
+    # YYMMDD expiry and the strike in thousandths; round first, strikes arrive as floats
+    return f"{symbol}{expiration[2:].replace('-', '')}{'C' if is_call else 'P'}{round(strike * 1000):08d}"
 
 class TradierAPI:
-    def __init__(self):
+    def __init__(self, session: requests.Session = None, file_cache: FileCache = None):
+        # Injected session lets callers share one keep-alive connection pool
+        self.session = session or self._default_session()
+        self.file_cache = file_cache
+        # A range ending today still has a forming bar; a closed range is effectively fixed
+        self._history_live = TTLCache(maxsize=512, ttl=Config.TRADIER_HISTORY_LIVE_TTL)
+        self._history_closed = TTLCache(maxsize=512, ttl=Config.TRADIER_HISTORY_CLOSED_TTL)
+        self._cache_lock = threading.Lock()
         self.token = Config.TRADIER_TOKEN
         self.account_id = Config.TRADIER_ACCOUNT_ID
         self.base_url = Config.TRADIER_API_URL
         self.headers = {
             'Authorization': f'Bearer {self.token}',
-            'Accept': 'application/json'
+            'Accept': 'application/json',
+            # Chains run to hundreds of KB; requests decompresses before orjson parses the bytes
+            'Accept-Encoding': 'gzip'
         }
+        # Auth stays per request: a shared session also talks to Yahoo and must not carry the token
+    
+    @staticmethod
+    def _default_session() -> requests.Session:
+        """Pooled session for standalone use, retrying transient gateway errors"""
+        session = requests.Session()
+        # Retry's default allowed_methods excludes POST, so orders are never resent
+        session.mount('https://', HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        ))
+        return session
+    
+    def _get(self, url, params=None):
+        """GET a Tradier endpoint and parse the JSON body"""
+        response = self.session.get(url, headers=self.headers, params=params)
+        return orjson.loads(response.content)
     
     def get_quotes(self, symbols):
         """Get real-time quotes"""
         url = f"{self.base_url}markets/quotes"
         params = {'symbols': ','.join(symbols) if isinstance(symbols, list) else symbols}
         
-        response = requests.get(url, headers=self.headers, params=params)
-        return response.json()
+        return self._get(url, params)
     
     def get_options_chain(self, symbol, expiration):
         """Get options chain for a symbol"""
@@ -29,32 +70,77 @@ class TradierAPI:
             'expiration': expiration
         }
         
-        response = requests.get(url, headers=self.headers, params=params)
-        return response.json()
+        return self._get(url, params)
+    
+    def get_option_strikes(self, symbol, expiration):
+        """Listed strikes for one expiration"""
+        url = f"{self.base_url}markets/options/strikes"
+        data = self._get(url, {'symbol': symbol, 'expiration': expiration})
+        # Tradier sends null for an unknown expiration and a bare number for a single strike
+        strikes = (data.get('strikes') or {}).get('strike') or []
+        return strikes if isinstance(strikes, list) else [strikes]
+    
+    def get_options_chain_near(self, symbol, expiration, price, k=5, option_types=('call', 'put'), strikes=None):
+        """Chain payload for the k strikes nearest price, quoting just those contracts"""
+        # Callers that fetched the strike list alongside the price pass it in
+        if strikes is None:
+            strikes = self.get_option_strikes(symbol, expiration)
+        if strikes:
+            nearest = heapq.nsmallest(k, strikes, key=lambda strike: abs(strike - price))
+            quotes = self.get_quotes([
+                _build_occ_symbol(symbol, expiration, float(strike), option_type == 'call')
+                for strike in nearest for option_type in option_types
+            ])
+            rows = (quotes.get('quotes') or {}).get('quote') or []
+            if rows:
+                return {'options': {'option': rows if isinstance(rows, list) else [rows]}}
+        # Roots that differ from the ticker (SPXW weeklies and the like) only show up in the full chain
+        return self.get_options_chain(symbol, expiration)
     
     def get_historical_data(self, symbol, interval='daily', start_date=None, end_date=None):
-        """Get historical data"""
+        """Get historical data, served from memory or disk while fresh"""
+        today = datetime.now().strftime('%Y-%m-%d')
         if start_date is None:
             start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
         if end_date is None:
-            end_date = datetime.now().strftime('%Y-%m-%d')
+            end_date = today
         
-        url = f"{self.base_url}markets/history"
-        params = {
-            'symbol': symbol,
-            'interval': interval,
-            'start': start_date,
-            'end': end_date
-        }
+        key = (symbol, interval, start_date, end_date)
+        if end_date >= today:
+            cache, ttl = self._history_live, Config.TRADIER_HISTORY_LIVE_TTL
+        else:
+            cache, ttl = self._history_closed, Config.TRADIER_HISTORY_CLOSED_TTL
+        with self._cache_lock:
+            data = cache.get(key)
+        if data is not None:
+            return data
         
-        response = requests.get(url, headers=self.headers, params=params)
-        return response.json()
+        if self.file_cache is not None:
+            data = self.file_cache.get('tradier_history', symbol, interval, start_date, end_date, ttl=ttl)
+        if data is None:
+            url = f"{self.base_url}markets/history"
+            params = {
+                'symbol': symbol,
+                'interval': interval,
+                'start': start_date,
+                'end': end_date
+            }
+            data = self._get(url, params)
+            # Error payloads carry no 'history' key and are not worth keeping
+            if 'history' not in data:
+                return data
+            if self.file_cache is not None:
+                self.file_cache.put('tradier_history', symbol, interval, start_date, end_date, value=data)
+        
+        with self._cache_lock:
+            cache[key] = data
+        return data
     
     def place_order(self, symbol, quantity, option_type, strike, expiration, side='buy_to_open'):
         """Place an options order"""
         url = f"{self.base_url}accounts/{self.account_id}/orders"
         
-        option_symbol = f"{symbol}{expiration.replace('-', '')}{'C' if option_type == 'call' else 'P'}{strike*1000:08d}"
+        option_symbol = _build_occ_symbol(symbol, expiration, strike, option_type == 'call')
         
         data = {
             'class': 'option',
@@ -65,11 +151,25 @@ class TradierAPI:
             'duration': 'day'
         }
         
-        response = requests.post(url, headers=self.headers, data=data)
-        return response.json()
+        response = self.session.post(url, headers=self.headers, data=data)
+        return orjson.loads(response.content)
     
     def get_account_positions(self):
         """Get current positions"""
         url = f"{self.base_url}accounts/{self.account_id}/positions"
-        response = requests.get(url, headers=self.headers)
-        return response.json()
+        return self._get(url)
+    
+    def get_positions_df(self):
+        """Get current positions as a typed DataFrame"""
+        positions = self.get_account_positions()
+        
+        # Tradier returns the string 'null' when the account is flat
+        if not isinstance(positions.get('positions'), dict):
+            return pd.DataFrame(columns=['symbol', 'quantity', 'cost_basis'])
+        
+        rows = positions['positions']['position']
+        if isinstance(rows, dict):
+            rows = [rows]
+        
+        df = pd.DataFrame(rows, columns=['symbol', 'quantity', 'cost_basis'])
+        return df.astype({'quantity': 'f8', 'cost_basis': 'f8'})